@@ -10,6 +10,9 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml C parser when PyYAML was built against it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 class BundleSecurity(BaseModel):
     max_products: int = Field(default=5, ge=1, le=10)
     max_discount: float = Field(default=30.0, ge=0, le=100)
@@ -42,6 +45,7 @@ class Settings(BaseModel):
     format: str = "docx"
     filename_pattern: str = "Offer_{product}_{language}_{currency}_{date}.{format}"
     template_pattern: str = "base_{language}.docx"
+    compress_level: Optional[int] = Field(default=None, ge=0, le=9, description="zlib level for saved documents, 0 stores uncompressed; unset keeps python-docx's default")
     security: SecuritySettings = Field(default_factory=SecuritySettings)
 
     @computed_field
@@ -147,15 +151,17 @@ def load_config(config_path: Path) -> AppConfig:
         if config_path.owner() != Path(__file__).owner():
             raise ValueError("Config file owner mismatch")
 
-        # Restrict YAML types
+        # Restrict YAML types: the safe loaders never register the
+        # python/object constructors, so only standard tags are accepted
         def restricted_load(stream):
-            loader = yaml.SafeLoader(stream)
-            # Remove potentially dangerous constructors
-            del loader.yaml_constructors['tag:yaml.org,2002:python/object']
-            del loader.yaml_constructors['tag:yaml.org,2002:python/object/apply']
-            return loader.get_single_data()
-
-        with open(config_path) as f:
+            loader = _YamlLoader(stream)
+            try:
+                return loader.get_single_data()
+            finally:
+                loader.dispose()
+
+        # libyaml reads bytes directly, so skip the text decode layer
+        with open(config_path, 'rb') as f:
             config_data = restricted_load(f)
             
         return AppConfig.model_validate(
@@ -5,6 +5,8 @@ from .exceptions import SecurityError
 from docxcompose.composer import Composer
 from .config import AppConfig
 from .exceptions import TemplateNotFoundError
+from ..utils.docx_reader import paragraph_texts, read_document_xml
+from ..utils.file_index import dir_listing, find_file
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,13 +51,17 @@ class FileHandler:
             self.config.common_path
         ])
 
+        language = language.upper()
         for base_path in search_locations:
+            # One stat of the directory; the patterns are checked in its listing
+            listing = dir_listing(base_path)
             for pattern in self.config.textblock_patterns:
-                target_path = base_path / pattern.format(
+                filename = pattern.format(
                     var_name=var_name,
-                    language=language.upper()
+                    language=language
                 )
-                if target_path.exists():
+                target_path = find_file(base_path, filename, listing)
+                if target_path is not None:
                     return target_path
         return None
 
@@ -67,8 +73,9 @@ class FileHandler:
         if target_path:
             try:
                 self._validate_file_security(target_path)
-                subdoc = DocxTemplate(str(target_path))
-                text = '\n'.join(p.text for p in subdoc.paragraphs if p.text.strip())
+                st = target_path.stat()
+                document_xml = read_document_xml(str(target_path), st.st_mtime_ns, st.st_size)
+                text = '\n'.join(t for t in paragraph_texts(document_xml) if t.strip())
                 
                 if len(text) > MAX_TEXTBLOCK_LENGTH:
                     raise ValueError(f"Textblock {target_path} exceeds size limit")
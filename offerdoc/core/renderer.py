@@ -74,7 +74,6 @@ class DocumentRenderer:
             doc = DocxTemplate(str(template_path))
             
             # Update context with resolved variables
-            template_vars = doc.get_undeclared_template_variables()
             resolved = self.resolve_variables(doc, context['PRODUCT'], context['LANGUAGE'])
             context.update(resolved)
             
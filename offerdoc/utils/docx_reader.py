@@ -0,0 +1,149 @@
+import io
+import zipfile
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+from docx.enum.text import WD_UNDERLINE
+from lxml import etree
+
+W_NS = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+_W = '{%s}' % W_NS['w']
+_PARAGRAPH_RUNS = etree.XPath('./w:r', namespaces=W_NS)
+_PARAGRAPH_TEXT_RUNS = etree.XPath('./w:r | ./w:hyperlink/w:r', namespaces=W_NS)
+_RUN_CONTENT = etree.XPath('w:br | w:cr | w:noBreakHyphen | w:ptab | w:t | w:tab', namespaces=W_NS)
+_OFF_VALUES = ('0', 'false', 'off')
+
+Run = Tuple[str, Any, Any, Any]
+
+def _run_text(run) -> str:
+    """Text of a <w:r> element, translated the same way python-docx does"""
+    parts = []
+    for el in _RUN_CONTENT(run):
+        tag = el.tag[len(_W):]
+        if tag == 't':
+            parts.append(el.text or "")
+        elif tag in ('tab', 'ptab'):
+            parts.append("\t")
+        elif tag == 'noBreakHyphen':
+            parts.append("-")
+        elif tag == 'cr' or el.get(_W + 'type', 'textWrapping') == 'textWrapping':
+            parts.append("\n")
+    return "".join(parts)
+
+def _run_toggle(rpr, name: str) -> Optional[bool]:
+    """Tri-state bold/italic value: None when unset, else the w:val flag"""
+    el = rpr.find(_W + name) if rpr is not None else None
+    if el is None:
+        return None
+    return el.get(_W + 'val', 'true').lower() not in _OFF_VALUES
+
+def _run_underline(rpr) -> Any:
+    """Underline value in the form python-docx's Run.underline accepts"""
+    el = rpr.find(_W + 'u') if rpr is not None else None
+    if el is None:
+        return None
+    val = el.get(_W + 'val')
+    if val is None:
+        return None  # python-docx treats a bare <w:u/> as unset
+    if val == 'single':
+        return True
+    if val == 'none':
+        return False
+    return WD_UNDERLINE.from_xml(val)
+
+@lru_cache(maxsize=256)
+def read_document_xml(path: str, mtime_ns: int, size: int) -> bytes:
+    """
+    Raw word/document.xml of a DOCX, inflated once per (path, mtime, size).
+    The size catches rewrites within one tick of a coarse mtime.
+    """
+    with zipfile.ZipFile(path) as z:
+        return z.read('word/document.xml')
+
+def _iter_body_paragraphs(document_xml: bytes) -> Iterator[Any]:
+    """
+    Stream the body-level <w:p> elements of document.xml.
+    Each paragraph is dropped once the caller is done with it instead of building the full tree.
+    """
+    for _, paragraph in etree.iterparse(io.BytesIO(document_xml), tag=_W + 'p'):
+        body = paragraph.getparent()
+        if body is None or body.tag != _W + 'body':
+            continue  # Table cell paragraphs are not part of doc.paragraphs
+        yield paragraph
+        paragraph.clear()
+        while paragraph.getprevious() is not None:
+            del body[0]
+
+def paragraph_texts(document_xml: bytes) -> List[str]:
+    """Text of each body paragraph, matching python-docx's Paragraph.text"""
+    return [
+        "".join(_run_text(run) for run in _PARAGRAPH_TEXT_RUNS(paragraph))
+        for paragraph in _iter_body_paragraphs(document_xml)
+    ]
+
+def paragraph_runs(document_xml: bytes) -> Tuple[Tuple[Run, ...], ...]:
+    """(text, bold, italic, underline) for each run of each body paragraph"""
+    paragraphs = []
+    for paragraph in _iter_body_paragraphs(document_xml):
+        runs = []
+        for run in _PARAGRAPH_RUNS(paragraph):
+            rpr = run.find(_W + 'rPr')
+            runs.append((
+                _run_text(run),
+                _run_toggle(rpr, 'b'),
+                _run_toggle(rpr, 'i'),
+                _run_underline(rpr),
+            ))
+        paragraphs.append(tuple(runs))
+    return tuple(paragraphs)
+
+def _toggle_xml(name: str, value: Optional[bool]) -> str:
+    """<w:b>/<w:i> element for a tri-state value, as python-docx writes it"""
+    if value is None:
+        return ""
+    return f'<w:{name}/>' if value else f'<w:{name} w:val="0"/>'
+
+def _underline_xml(value: Any) -> str:
+    """<w:u> element for a Run.underline value"""
+    if value is None:
+        return ""
+    if value is True:
+        return '<w:u w:val="single"/>'
+    if value is False:
+        return '<w:u w:val="none"/>'
+    return f'<w:u w:val="{WD_UNDERLINE.to_xml(value)}"/>'
+
+def _text_xml(text: str) -> str:
+    """Run content for text, splitting tabs and line breaks like Run.add_text"""
+    parts = []
+    start = 0
+    for i, char in enumerate(text):
+        if char in "\t\r\n":
+            if i > start:
+                parts.append(f'<w:t xml:space="preserve">{escape(text[start:i])}</w:t>')
+            parts.append('<w:tab/>' if char == "\t" else '<w:br/>')
+            start = i + 1
+    if start < len(text):
+        parts.append(f'<w:t xml:space="preserve">{escape(text[start:])}</w:t>')
+    return "".join(parts)
+
+def paragraph_xml(runs: Tuple[Run, ...]) -> str:
+    """
+    <w:p> markup for (text, bold, italic, underline) runs, using the w: prefix
+    declared by the enclosing document. Same content as add_paragraph() plus
+    add_run() per run, built as one string.
+    """
+    parts = ['<w:p>']
+    # Neighbouring runs with the same formatting are written as one run
+    for (bold, italic, underline), group in groupby(runs, key=itemgetter(1, 2, 3)):
+        text = "".join(run[0] for run in group)
+        rpr = _toggle_xml('b', bold) + _toggle_xml('i', italic) + _underline_xml(underline)
+        parts.append('<w:r>')
+        if rpr:
+            parts.append(f'<w:rPr>{rpr}</w:rPr>')
+        parts.append(_text_xml(text))
+        parts.append('</w:r>')
+    parts.append('</w:p>')
+    return "".join(parts)
@@ -0,0 +1,72 @@
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+class DirListing(frozenset):
+    """
+    Names in one directory. `folded` maps casefolded names to the listed ones
+    when the filesystem resolves names regardless of case, and is None otherwise.
+    """
+    folded: Optional[Dict[str, str]] = None
+
+    def find(self, filename: str) -> Optional[str]:
+        """Listed name that `filename` opens, answered without touching the disk"""
+        if filename in self:
+            return filename
+        if self.folded is not None:
+            return self.folded.get(filename.casefold())
+        return None
+
+_EMPTY_LISTING = DirListing()
+
+def _ignores_case(path: str, names: frozenset) -> bool:
+    """Whether the directory opens names spelled in another case, probed with one entry"""
+    for name in names:
+        swapped = name.swapcase()
+        if swapped != name:
+            try:
+                return os.path.samestat(os.stat(os.path.join(path, name)),
+                                        os.stat(os.path.join(path, swapped)))
+            except OSError:
+                return False
+    return False
+
+@lru_cache(maxsize=64)
+def _scan_dir(path: str, mtime_ns: int, size: int, inode: int) -> DirListing:
+    """
+    File names in a directory, listed once per directory (mtime, size, inode).
+    Size and inode catch changes within one tick of a coarse mtime and
+    directories replaced by another one.
+    """
+    with os.scandir(path) as entries:
+        listing = DirListing(entry.name for entry in entries)
+    if _ignores_case(path, listing):
+        listing.folded = {name.casefold(): name for name in listing}
+    return listing
+
+def dir_listing(directory: Path) -> DirListing:
+    """
+    Cached names in `directory`, empty if it does not exist.
+    One stat of the directory replaces a stat per candidate file.
+    """
+    try:
+        st = directory.stat()
+        return _scan_dir(str(directory), st.st_mtime_ns, st.st_size, st.st_ino)
+    except (FileNotFoundError, NotADirectoryError):
+        return _EMPTY_LISTING
+
+def find_file(directory: Path, filename: str, listing: Optional[DirListing] = None) -> Optional[Path]:
+    """
+    Path of `filename` in `directory`, or None, looked up in the cached listing.
+    Pass `listing` to check several candidates against one stat of the directory.
+    Names containing '/' are looked up in the listing of their subdirectory.
+    """
+    head, _, name = filename.rpartition('/')
+    if head:
+        directory = directory / head
+        listing = dir_listing(directory)
+    elif listing is None:
+        listing = dir_listing(directory)
+    found = listing.find(name)
+    return directory / found if found is not None else None
@@ -13,8 +13,21 @@ COLOR = {
     'UNDERLINE': '\033[4m'
 }
 
+# Color code + {} + reset, per color name
+_FORMATS: Dict[str, str] = {name: code + "{}" + COLOR['ENDC'] for name, code in COLOR.items()}
+
+# isatty() result for the stream sys.stdout was last seen as
+_tty_state = [None, False]
+
+def _stdout_is_tty() -> bool:
+    """sys.stdout.isatty(), asked again only when sys.stdout is replaced"""
+    stream = sys.stdout
+    if _tty_state[0] is not stream:
+        _tty_state[:] = [stream, stream.isatty()]
+    return _tty_state[1]
+
 def colorize(text: str, color: str) -> str:
     """Wrap text in ANSI color codes if output is a terminal"""
-    if sys.stdout.isatty():
-        return f"{COLOR[color.upper()]}{text}{COLOR['ENDC']}"
+    if _stdout_is_tty():
+        return _FORMATS[color.upper()].format(text)
     return text
@@ -1,53 +1,88 @@
 #!/usr/bin/env python3
+import os
 import sys
 import logging
-import traceback
+import mmap
+import pickle
+import hashlib
+import io
+import weakref
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Dict, List, Set, Any, Optional, Tuple
+from typing import Callable, Dict, FrozenSet, List, Set, Any, Optional, Tuple
 from dataclasses import dataclass, field
-from docx import Document
 from docxtpl import DocxTemplate, RichText
+from docx.opc.pkgwriter import PackageWriter
 import yaml
+from jinja2 import Environment, FileSystemBytecodeCache
 
 from offerdoc.core.config import load_config, AppConfig
 from offerdoc.core.exceptions import handle_document_errors
 from offerdoc.core.file_handler import FileHandler
 from offerdoc.core.renderer import DocumentRenderer
+from offerdoc.utils.docx_reader import paragraph_runs, paragraph_texts, paragraph_xml, read_document_xml
+from offerdoc.utils.file_index import dir_listing, find_file
 from offerdoc.utils.formatters import colorize
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml C parser when PyYAML was built against it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 from offerdoc.core.config import AppConfig
 
 from pydantic import ConfigDict, model_validator
 from typing import Optional, Dict, Any
 
+_REQUIRED_SECTIONS = ('offer', 'settings', 'customer', 'sales')
+
 class Config(AppConfig):
     """Extended configuration with runtime properties"""
     model_config = ConfigDict(validate_default=True, extra='forbid')
 
+
     @model_validator(mode='after')
     def validate_config(self) -> 'Config':
         """Validate configuration after initialization."""
         # Only validate required fields in production mode
         if not getattr(self, '_test_mode', False):
-            required_sections = ['offer', 'settings', 'customer', 'sales']
-            for section in required_sections:
-                if not getattr(self, section, None):
+            for section in _REQUIRED_SECTIONS:
+                if getattr(self, section, None) is None:
                     raise ValueError(f"Missing required section: {section}")
 
             # Validate critical fields that must always be present
-            if self.settings:
-                if not getattr(self.settings, 'templates', None):
-                    raise ValueError("Missing required field: settings.templates")
+            if not self.settings.templates:
+                raise ValueError("Missing required field: settings.templates")
                 
-            if self.offer:
-                if not getattr(self.offer, 'number', None):
-                    raise ValueError("Missing required field: offer.number")
+            if not self.offer.number:
+                raise ValueError("Missing required field: offer.number")
 
         return self
 
+    def config_paths(self) -> Dict[str, Any]:
+        """
+        Map every dot path of model_dump() ('offer', 'offer.validity.EN', ...)
+        to its value, from a fresh dump so in-place edits are always seen.
+        Built once per resolve_template_variables call; single lookups go
+        through resolve_config_variable instead.
+        """
+        table = {}
+        stack = [("", self.model_dump())]
+        while stack:
+            prefix, node = stack.pop()
+            for key, value in node.items():
+                if not isinstance(key, str):
+                    continue
+                path = prefix + key
+                table[path] = value
+                if isinstance(value, dict):
+                    stack.append((path + ".", value))
+        return table
+
     @classmethod
     def for_tests(cls, **data) -> 'Config':
         """Create a config instance for testing with relaxed validation"""
@@ -55,31 +90,114 @@ class Config(AppConfig):
         instance._test_mode = True
         return instance
 
+_CONFIG_CACHE_SIZE = 100
+# Pickled validated configs by absolute path, with the (mtime_ns, size) they were built from
+_config_cache: "OrderedDict[str, Tuple[Tuple[int, int], bytes]]" = OrderedDict()
+
+def _read_config_data(config_path: Path) -> Any:
+    """Parse the YAML file"""
+    # libyaml reads bytes directly, so hand it the mapped file instead of
+    # going through the text decode and buffered reader layers
+    with open(config_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None  # mmap cannot map an empty file; YAML parses it to None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return yaml.load(mapped, Loader=_YamlLoader)
+
+def _cached_config(key: Tuple[Any, ...]) -> Optional[bytes]:
+    """Pickled config for key from this process, if the file is unchanged"""
+    path, stamp = key[2], key[:2]
+    cached = _config_cache.get(path)
+    if cached and cached[0] == stamp:
+        _config_cache.move_to_end(path)
+        return cached[1]
+    return None
+
+def _remember_config(key: Tuple[Any, ...], blob: bytes):
+    """Keep a pickled config in the in-process LRU"""
+    _config_cache[key[2]] = (key[:2], blob)
+    _config_cache.move_to_end(key[2])
+    if len(_config_cache) > _CONFIG_CACHE_SIZE:
+        _config_cache.popitem(last=False)
+
 def load_config(config_path: Path) -> Config:
-    """Load configuration from YAML file."""
+    """
+    Load configuration from YAML file.
+    Validated configs are reused while the file's mtime and size are unchanged;
+    every call still returns an independent copy.
+    """
     try:
-        with open(config_path) as f:
-            config_data = yaml.safe_load(f)
-            
+        st = config_path.stat()
+        # abspath is enough to tell files apart and, unlike resolve(), needs no per-component syscalls
+        key = (st.st_mtime_ns, st.st_size, os.path.abspath(config_path))
+        blob = _cached_config(key)
+        if blob is not None:
+            config = pickle.loads(blob)  # Only ever pickled by this process, below
+            config.settings.validate_secure_paths()  # Depends on the filesystem, not the YAML
+            return config
+
+        config_data = _read_config_data(config_path)
+
         # Create config instance with context
-        return Config.model_validate(
+        config = Config.model_validate(
             config_data,
             context={"config_path": config_path}  # Add context for path resolution
         )
-        
+        blob = pickle.dumps(config, protocol=pickle.HIGHEST_PROTOCOL)
+        _remember_config(key, blob)
+        return config
+
     except Exception as e:
         logger.error(f"Error loading config from {config_path}: {e}")
         if isinstance(e, (ValueError, TypeError)):
             raise  # Re-raise validation errors for tests to catch
         sys.exit(1)
 
+load_config.cache_clear = _config_cache.clear
+
 def get_product_names(config: Config) -> List[str]:
     """Get list of available products from the products directory."""
     products_dir = config.products_path
-    if not products_dir.exists():
+    try:
+        # DirEntry.is_dir() reuses the readdir entry type, so only symlinked
+        # product folders (still followed, as before) cost a stat
+        with os.scandir(products_dir) as entries:
+            return [entry.name for entry in entries if entry.is_dir()]
+    except FileNotFoundError:
         logger.error(f"Products directory not found: {products_dir}")
         return []
-    return [d.name for d in products_dir.iterdir() if d.is_dir()]
+
+@lru_cache(maxsize=256)
+def _textblock_text(path: str, mtime_ns: int, size: int) -> str:
+    """Plain text of a textblock DOCX, extracted once per (path, mtime, size)"""
+    paragraphs = paragraph_texts(read_document_xml(path, mtime_ns, size))
+    # Join paragraphs with double newlines to preserve formatting
+    return "\n\n".join(text for text in paragraphs if text.strip())
+
+class TextblockXml:
+    """
+    Body markup of a textblock, inserted into a template like a docxtpl Subdoc.
+    A Subdoc builds a whole python-docx Document only to serialise its body,
+    while this markup depends on the file alone and is shared between renders.
+    """
+    __slots__ = ("xml",)
+
+    def __init__(self, xml: str):
+        self.xml = xml
+
+    def __html__(self) -> str:
+        return self.xml
+
+    __str__ = __html__
+
+@lru_cache(maxsize=256)
+def _load_textblock_xml(path: str, mtime_ns: int, size: int) -> TextblockXml:
+    """
+    Parse a textblock DOCX into <w:p> markup keeping bold/italic/underline runs.
+    Keyed by mtime and size so each file is parsed once per change, not once per render.
+    """
+    paragraphs = paragraph_runs(read_document_xml(path, mtime_ns, size))
+    return TextblockXml("".join(paragraph_xml(runs) for runs in paragraphs))
 
 def load_textblock_file(file_path: Path) -> str:
     """
@@ -87,14 +205,65 @@ def load_textblock_file(file_path: Path) -> str:
     Returns the text content preserving paragraphs.
     """
     try:
-        doc = Document(str(file_path))
-        # Join paragraphs with double newlines to preserve formatting
-        content = "\n\n".join(paragraph.text for paragraph in doc.paragraphs if paragraph.text.strip())
-        return content
+        st = file_path.stat()
+        return _textblock_text(str(file_path), st.st_mtime_ns, st.st_size)
     except Exception as e:
         logger.error(f"Error reading textblock file {file_path}: {e}")
         return ""
 
+_VAR_MARKER = "\0"
+
+@lru_cache(maxsize=32)
+def _compile_textblock_patterns(patterns: Tuple[str, ...], language: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    Apply the language to each textblock pattern once and split it around
+    {var_name}, so each candidate file name is a plain concatenation.
+    Patterns using {var_name} more than once keep (pattern, None).
+    """
+    compiled = []
+    for pattern in patterns:
+        formatted = pattern.format(var_name=_VAR_MARKER, language=language)
+        if formatted.count(_VAR_MARKER) == 1:
+            prefix, suffix = formatted.split(_VAR_MARKER)
+            compiled.append((prefix, suffix))
+        else:
+            compiled.append((pattern, None))
+    return tuple(compiled)
+
+@lru_cache(maxsize=64)
+def _textblock_index(names: frozenset, patterns: Tuple[Tuple[str, str], ...]) -> Dict[str, str]:
+    """
+    Map each variable name to its textblock file in one directory listing,
+    taking the first pattern that matches, as the pattern loop would.
+    """
+    index = {}
+    for prefix, suffix in patterns:
+        min_length = len(prefix) + len(suffix)
+        for name in names:
+            if len(name) > min_length and name.startswith(prefix) and name.endswith(suffix):
+                index.setdefault(name[len(prefix):len(name) - len(suffix)], name)
+    return index
+
+def _find_textblock(var_name: str, base_path: Path, patterns: Tuple[Tuple[str, Optional[str]], ...],
+                    language: str) -> Optional[Path]:
+    """Path of the first textblock file matching var_name in base_path"""
+    # The directory is stat'ed once; every candidate is checked in its listing
+    listing = dir_listing(base_path)
+    # Flat prefix/suffix patterns resolve through the listing's index
+    if listing.folded is None and all(suffix is not None and '/' not in prefix + suffix
+                                      for prefix, suffix in patterns):
+        filename = _textblock_index(listing, patterns).get(var_name)
+        return base_path / filename if filename else None
+
+    for prefix, suffix in patterns:
+        if suffix is None:
+            filename = prefix.format(var_name=var_name, language=language)
+        else:
+            filename = prefix + var_name + suffix
+        target_path = find_file(base_path, filename, listing)
+        if target_path is not None:
+            return target_path
+    return None
 
 def load_textblock(var_name: str, config: Config, product_name: str, language: str, template: DocxTemplate) -> Tuple[Optional[Any], Optional[Path]]:
     """Dynamically load DOCX content using configured patterns"""
@@ -102,67 +271,81 @@ def load_textblock(var_name: str, config: Config, product_name: str, language: s
         config.products_path / product_name,
         config.common_path
     ]
+    language = language.upper()
+    patterns = _compile_textblock_patterns(tuple(config.textblock_patterns), language)
 
     for base_path in search_locations:
-        for pattern in config.textblock_patterns:
-            target_path = base_path / pattern.format(
-                var_name=var_name,
-                language=language.upper()
-            )
-            if target_path.exists():
-                try:
-                    # Create subdoc with preserved formatting
-                    subdoc = template.new_subdoc()
-                    doc = Document(str(target_path))
-                    for paragraph in doc.paragraphs:
-                        p = subdoc.add_paragraph()
-                        for run in paragraph.runs:
-                            r = p.add_run(run.text)
-                            r.bold = run.bold
-                            r.italic = run.italic
-                            r.underline = run.underline
-                    return subdoc, target_path
-                except Exception as e:
-                    logger.error(f"Failed to load subdoc {target_path}: {e}")
-                    return None, None
+        target_path = _find_textblock(var_name, base_path, patterns, language)
+        if target_path is not None:
+            try:
+                # Subdoc-equivalent markup with preserved formatting
+                st = target_path.stat()
+                return _load_textblock_xml(str(target_path), st.st_mtime_ns, st.st_size), target_path
+            except Exception as e:
+                logger.error(f"Failed to load subdoc {target_path}: {e}")
+                return None, None
     return None, None
 
+# Sentinel for config paths that do not exist (None is a valid value)
+_MISSING = object()
+
 def resolve_template_variables(template_vars: Set[str], config: Config, 
                             product_name: str, language: str,
-                            template: DocxTemplate) -> Dict[str, Any]:
-    """Resolve variables from config, textblocks, and special handlers"""
-    resolved = {}
+                            template: DocxTemplate,
+                            context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Resolve variables from config, textblocks, and special handlers.
+    Given a context, variables already in it are kept and the rest are added to it.
+    """
+    resolved = {} if context is None else context
     language = language.upper()
+    config_values = config.config_paths()
+    # Report lines are collected and written at once; skipped entirely when quiet
+    verbose = logger.isEnabledFor(logging.INFO)
+    lines = [colorize(f"\n🔍 Resolving {len(template_vars)} template variables:", 'CYAN')] if verbose else None
     
-    print(colorize(f"\n🔍 Resolving {len(template_vars)} template variables:", 'CYAN'))
-    
-    for var in sorted(template_vars):
+    # Sorting only matters for the report
+    for var in (sorted(template_vars) if verbose else template_vars):
+        if var in resolved:
+            continue
         # First try direct config value
-        try:
-            resolved[var] = resolve_config_variable(var, config)
-            print(f"  {colorize(var.ljust(20), 'GREEN')} {colorize('←', 'BLUE')} config.{var.replace('_', '.')}")
+        value = config_values.get(var, _MISSING)
+        if value is not _MISSING:
+            resolved[var] = value
+            if verbose:
+                lines.append(f"  {colorize(var.ljust(20), 'GREEN')} {colorize('←', 'BLUE')} config.{var.replace('_', '.')}")
             continue
-        except (ValueError, AttributeError):
-            pass
             
         # Then try to load as DOCX subdocument
         subdoc, source_path = load_textblock(var, config, product_name, language, template)
         if subdoc:
             resolved[var] = subdoc
-            print(f"  {colorize(var.ljust(20), 'YELLOW')} {colorize('←', 'BLUE')} {colorize(str(source_path.relative_to(config.common_path.parent)), 'CYAN')}")
+            if verbose:
+                lines.append(f"  {colorize(var.ljust(20), 'YELLOW')} {colorize('←', 'BLUE')} {colorize(str(source_path.relative_to(config.common_path.parent)), 'CYAN')}")
             continue
             
         # Fallback to empty string if nothing found
         resolved[var] = ""
-        print(f"  {colorize(var.ljust(20), 'RED')} {colorize('← WARNING: No config value or DOCX found', 'RED')}")
+        if verbose:
+            lines.append(f"  {colorize(var.ljust(20), 'RED')} {colorize('← WARNING: No config value or DOCX found', 'RED')}")
     
+    if verbose:
+        sys.stdout.write("\n".join(lines) + "\n")
     return resolved
 
+@lru_cache(maxsize=256)
+def _split_config_path(var_path: str) -> Tuple[str, ...]:
+    """Split a dotted config path once and reuse the parts across renders"""
+    return tuple(var_path.split('.'))
+
 def resolve_config_variable(var_path: str, config: Config) -> Any:
     """Resolve nested dictionary paths using dot notation"""
-    parts = var_path.split('.')  # Change to dot notation
-    current = config.model_dump()  # Start with full config dict
-    
+    section, *parts = _split_config_path(var_path)
+    # Only the section the path starts in is dumped, so single-segment
+    # names (LANGUAGE, section_1_1, ...) cost a field check at most
+    if section not in type(config).model_fields:
+        raise ValueError(f"Config path not found: {var_path}")
+    current = config.model_dump(include={section})[section]
     for part in parts:
         if isinstance(current, dict) and part in current:
             current = current[part]
@@ -170,47 +353,256 @@ def resolve_config_variable(var_path: str, config: Config) -> Any:
             raise ValueError(f"Config path not found: {var_path}")
     return current
 
+def _rich_text(text: str) -> Any:
+    """RichText helper exposed to templates as `r`; module-level so contexts pickle"""
+    return RichText(text) if text else ""
+
+# Config sections exposed to templates as plain dicts
+_CONTEXT_SECTIONS = ("offer", "customer", "sales", "settings")
+
 def build_context(config: Config, language: str, product_name: str, currency: str) -> Dict[str, Any]:
     """Build base context with core variables."""
-    return {
-        "offer": config.offer.model_dump(),
-        "customer": config.customer.model_dump(),
-        "sales": config.sales.model_dump(),
-        "settings": config.settings.model_dump(),
+    # Dumped per call: callers may edit the config or the returned dicts
+    context = {section: getattr(config, section).model_dump() for section in _CONTEXT_SECTIONS}
+    context.update({
         "contacts": config.sales.contacts,  # Add explicit access to contacts
         "LANGUAGE": language.upper(),
         "PRODUCT": product_name,
         "CURRENCY": currency,
-        "r": lambda text: RichText(text) if text else ""  # Add RichText helper
-    }
+        "r": _rich_text  # Add RichText helper
+    })
+    return context
+
+@lru_cache(maxsize=32)
+def _read_template_bytes(path: str, mtime_ns: int, size: int) -> bytes:
+    """
+    Template package read from disk once per (path, mtime, size) and rewritten
+    uncompressed, so each DocxTemplate built from it skips inflating the parts.
+    """
+    stored = io.BytesIO()
+    with zipfile.ZipFile(path) as src, zipfile.ZipFile(stored, 'w', zipfile.ZIP_STORED) as dst:
+        for info in src.infolist():
+            dst.writestr(info, src.read(info), compress_type=zipfile.ZIP_STORED)
+    return stored.getvalue()
+
+def load_template(template_path: Path) -> DocxTemplate:
+    """
+    Create a fresh DocxTemplate for rendering.
+    Rendering mutates the parsed document, so only the file bytes are shared.
+    """
+    st = template_path.stat()
+    key = (str(template_path), st.st_mtime_ns, st.st_size)
+    template = DocxTemplate(io.BytesIO(_read_template_bytes(*key)))
+    _template_sources[template] = key
+    return template
+
+# Source (path, mtime, size) of templates created by load_template
+_template_sources: "weakref.WeakKeyDictionary[DocxTemplate, Tuple[str, int, int]]" = weakref.WeakKeyDictionary()
 
-def render_offer(template: DocxTemplate, config: Config, context: Dict[str, Any], output_path: Path):
-    """Render template with auto-discovered variables"""
+@lru_cache(maxsize=32)
+def _scan_template_variables(path: str, mtime_ns: int, size: int) -> FrozenSet[str]:
+    """Undeclared variables of a template file, scanned once per (path, mtime, size)"""
+    template = DocxTemplate(io.BytesIO(_read_template_bytes(path, mtime_ns, size)))
+    return frozenset(template.get_undeclared_template_variables())
+
+def get_template_variables(template: DocxTemplate) -> Set[str]:
+    """Undeclared variables of a template, shared across renders of the same file"""
+    key = _template_sources.get(template)
+    if key is None:
+        return set(template.get_undeclared_template_variables())
+    return set(_scan_template_variables(*key))
+
+class _PackageZipWriter:
+    """PhysPkgWriter counterpart that writes package parts at a chosen zlib level"""
+
+    def __init__(self, output_path: Path, compress_level: int):
+        if compress_level == 0:
+            self._zipf = zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED)
+        else:
+            self._zipf = zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compress_level)
+
+    def write(self, pack_uri, blob: bytes):
+        self._zipf.writestr(pack_uri.membername, blob)
+
+    def close(self):
+        self._zipf.close()
+
+def _save_package(template: DocxTemplate, output_path: Path, compress_level: Optional[int]):
+    """
+    Save a rendered template. python-docx always deflates at zlib's default
+    level, so another level writes the parts straight into one zip at that
+    level, the way PackageWriter.write does; 0 stores them uncompressed.
+    """
+    if compress_level is None:
+        template.save(str(output_path))
+        return
+    # DocxTemplate.save() with the package write swapped out
+    template.pre_processing()
+    package = template.docx.part.package
+    parts = package.parts
+    for part in parts:
+        part.before_marshal()
+    writer = _PackageZipWriter(output_path, compress_level)
+    try:
+        PackageWriter._write_content_types_stream(writer, parts)
+        PackageWriter._write_pkg_rels(writer, package.rels)
+        PackageWriter._write_parts(writer, parts)
+    finally:
+        writer.close()
+    template.post_processing(str(output_path))
+    template.is_saved = True
+
+# Output directories already created by this process
+_created_dirs: Set[Path] = set()
+
+def _ensure_dir(path: Path):
+    """mkdir -p, done once per directory per process"""
+    if path not in _created_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(path)
+
+_FILENAME_PART_COLORS = {'DE': 'CYAN', 'EN': 'CYAN', 'CHF': 'GREEN', 'EUR': 'GREEN'}
+
+def _save_rendered(template: DocxTemplate, output_path: Path, compress_level: Optional[int] = None):
+    """Write a rendered template to disk and print a summary line"""
+    # Ensure parent directories exist
+    _ensure_dir(output_path.parent)
+    
+    # Save with configured format
+    try:
+        _save_package(template, output_path, compress_level)
+    except FileNotFoundError:
+        # The directory was removed since it was created; make it again
+        _created_dirs.discard(output_path.parent)
+        _ensure_dir(output_path.parent)
+        _save_package(template, output_path, compress_level)
+    
+    # Enhanced output message with safe path handling; save() raises on
+    # failure, so the file is known to exist here
+    try:
+        # Try to get relative path first
+        rel_path = output_path.relative_to(Path.cwd())
+        display_path = str(rel_path)
+    except ValueError:
+        # Fall back to absolute path if not in CWD; output paths built from
+        # the resolved settings.output are already absolute
+        display_path = str(output_path if output_path.is_absolute() else output_path.resolve())
+    
+    file_size = output_path.stat().st_size / 1024
+    
+    # Split into directory and filename components
+    path_obj = Path(display_path)
+    dir_part = str(path_obj.parent)
+    file_name = path_obj.name
+    
+    # Color directory in yellow and process filename
+    colored_dir = colorize(dir_part, 'YELLOW') if dir_part != '.' else ''
+    
+    # Split filename into components: languages cyan, currencies green, rest yellow
+    colored_filename = '_'.join(
+        colorize(part, _FILENAME_PART_COLORS.get(part, 'YELLOW')) for part in file_name.split('_')
+    )
+    size_str = colorize(f"({file_size:.1f} KB)", 'BLUE')
+    
+    # Combine path parts, handling current directory case
+    full_colored_path = f"{colored_dir}/{colored_filename}" if colored_dir else colored_filename
+    print(f"\n{colorize('✅ Document:', 'GREEN')} {full_colored_path} {size_str}")
+
+class _CachingEnvironment(Environment):
+    """
+    Jinja environment that compiles each distinct template source once.
+    docxtpl calls from_string() on the patched XML of every part for every
+    render, and that XML is identical for all renders of one template file.
+    """
+    cache_limit = 32
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self._compiled: "OrderedDict[str, Any]" = OrderedDict()
+
+    def from_string(self, source, globals=None, template_class=None):
+        if globals or template_class or not isinstance(source, str):
+            return super().from_string(source, globals, template_class)
+        template = self._compiled.get(source)
+        if template is None:
+            template = self._compile_source(source)
+            self._compiled[source] = template
+            if len(self._compiled) > self.cache_limit:
+                self._compiled.popitem(last=False)
+        else:
+            self._compiled.move_to_end(source)
+        return template
+
+    def _compile_options(self) -> str:
+        """Environment options that are compiled into the bytecode"""
+        return repr((
+            self.autoescape, self.optimized, sorted(self.extensions),
+            self.block_start_string, self.block_end_string,
+            self.variable_start_string, self.variable_end_string,
+            self.comment_start_string, self.comment_end_string,
+            self.line_statement_prefix, self.line_comment_prefix,
+            self.trim_blocks, self.lstrip_blocks,
+            self.newline_sequence, self.keep_trailing_newline,
+        ))
+
+    def _compile_source(self, source: str):
+        """Compile via the bytecode cache, when enabled, so other processes skip the compile"""
+        bytecode_cache = _bytecode_cache()
+        if bytecode_cache is None:
+            return super().from_string(source)
+        # Buckets are keyed by name, so name each source by its digest
+        # together with the options that change the compiled code
+        digest = hashlib.sha1(source.encode("utf-8"))
+        digest.update(self._compile_options().encode("utf-8"))
+        bucket = bytecode_cache.get_bucket(self, digest.hexdigest(), None, source)
+        if bucket.code is None:
+            bucket.code = self.compile(source)
+            bytecode_cache.set_bucket(bucket)
+        return self.template_class.from_code(self, bucket.code, self.make_globals(None))
+
+@lru_cache(maxsize=None)
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """
+    Opt-in bytecode cache shared by the render worker processes and across
+    runs, in the directory named by OFFERDOC_BYTECODE_CACHE; created on first use.
+    """
+    directory = os.environ.get("OFFERDOC_BYTECODE_CACHE")
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory)
+
+_jinja_env = _CachingEnvironment(autoescape=True, auto_reload=False)
+
+def complete_context(template: DocxTemplate, config: Config, context: Dict[str, Any]):
+    """Resolve the template's variables that are not in the context yet, in place"""
+    # Get all variables from the template using proper detection,
+    # minus built-in Jinja names and those already in the context
+    vars_to_resolve = get_template_variables(template) - {'True', 'False', 'None'} - context.keys()
+    if not vars_to_resolve:
+        return
+    
+    # Resolve the rest from multiple sources straight into the context
+    resolve_template_variables(vars_to_resolve, config,
+                               context['PRODUCT'], context['LANGUAGE'],
+                               template, context)
+
+def render_offer(template: DocxTemplate, config: Config, context: Dict[str, Any], output_path: Path,
+                 save_pool: Optional[Executor] = None) -> Optional[Future]:
+    """
+    Render template with auto-discovered variables.
+    With a save_pool the save runs there and its Future is returned.
+    """
     try:
         logger.debug("Rendering context contains: %s", context.keys())
         logger.debug("Bundle data: %s", context.get('bundle'))
         logger.debug("Discount value: %s", context.get('discount'))
         
         
-        # Get all variables from the template using proper detection
-        template_vars = set(template.get_undeclared_template_variables())
-        
-        # Remove built-in Jinja variables
-        template_vars -= {'True', 'False', 'None'}
-        
-        # Only resolve variables not already in context
-        vars_to_resolve = {var for var in template_vars if var not in context}
-        
-        # Resolve variables from multiple sources
-        resolved_context = resolve_template_variables(vars_to_resolve, config,
-                                                   context['PRODUCT'], context['LANGUAGE'],
-                                                   template)
-        
-        # Merge with existing context
-        context.update(resolved_context)
+        complete_context(template, config, context)
 
         # Render template with complete context
-        template.render(context, autoescape=True)
+        template.render(context, _jinja_env, autoescape=True)
         
         # Handle different output formats
         output_format = output_path.suffix[1:].lower()
@@ -220,100 +612,128 @@ def render_offer(template: DocxTemplate, config: Config, context: Dict[str, Any]
             document_part = template.docx.part
             document_part._content_type = 'application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml'
         
-        # Ensure parent directories exist
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Save with configured format
-        template.save(str(output_path))
-        
-        # Enhanced output message with safe path handling
-        if output_path.exists():
-            try:
-                # Try to get relative path first
-                rel_path = output_path.relative_to(Path.cwd())
-                display_path = str(rel_path)
-            except ValueError:
-                # Fall back to absolute path if not in CWD
-                display_path = str(output_path.resolve())
-            
-            file_size = output_path.stat().st_size / 1024
-            
-            # Split into directory and filename components
-            path_obj = Path(display_path)
-            dir_part = str(path_obj.parent)
-            file_name = path_obj.name
-            
-            # Color directory in yellow and process filename
-            colored_dir = colorize(dir_part, 'YELLOW') if dir_part != '.' else ''
-            
-            # Split filename into components
-            parts = file_name.split('_')
-            colored_parts = []
-            for part in parts:
-                if part in ['DE', 'EN']:
-                    colored_parts.append(colorize(part, 'CYAN'))
-                elif part in ['CHF', 'EUR']:
-                    colored_parts.append(colorize(part, 'GREEN'))
-                else:
-                    colored_parts.append(colorize(part, 'YELLOW'))
-                    
-            colored_filename = '_'.join(colored_parts)
-            size_str = colorize(f"({file_size:.1f} KB)", 'BLUE')
-            
-            # Combine path parts, handling current directory case
-            full_colored_path = f"{colored_dir}/{colored_filename}" if colored_dir else colored_filename
-            print(f"\n{colorize('✅ Document:', 'GREEN')} {full_colored_path} {size_str}")
+        # Saving compresses the package; hand it off when a pool is given
+        compress_level = config.settings.compress_level
+        if save_pool is not None:
+            return save_pool.submit(_save_rendered, template, output_path, compress_level)
+        _save_rendered(template, output_path, compress_level)
+        return None
         
     except Exception as e:
         logger.error(f"Error during template rendering: {e}")
-        logger.error(f"Error details: {traceback.format_exc()}")
+        # The re-raise carries the traceback; only format it here when debugging
+        logger.debug("Error details", exc_info=True)
         raise
 
-def generate_bundle_offer(config: Config, bundle_name: str):
-    """Generate offer documents for a product bundle"""
+def find_templates(config: Config, pattern: str, languages: List[str]) -> Dict[str, Path]:
+    """Map each language to its existing template file, logging missing ones"""
+    templates = {}
+    listing = dir_listing(config.templates_path)
+    for lang in languages:
+        filename = pattern.format(language=lang)
+        template_path = find_file(config.templates_path, filename, listing)
+        if template_path is not None:
+            templates[lang] = template_path
+        else:
+            logger.error(f"Missing template for {lang}: {config.templates_path / filename}")
+    return templates
+
+_worker_config: Optional[Config] = None
+
+def _init_worker(config: Config):
+    """Receive the config once per worker process instead of once per job"""
+    global _worker_config
+    _worker_config = config
+
+def _render_job(template_path: Path, language: str, product: str, renders: List[Tuple[str, Path]]):
+    """
+    Render the documents of one (language, product); runs in a worker process.
+    Keeping all currencies in one process lets them share its textblock caches.
+    The context is built here from the worker's config, so jobs only carry names.
+    """
+    product_context = build_context(_worker_config, language, product, "")
+    # Resolved variables do not depend on the currency, so resolve them once
+    complete_context(load_template(template_path), _worker_config, product_context)
+    for currency, output_path in renders:
+        context = product_context.copy()
+        context["CURRENCY"] = currency
+        template = load_template(template_path)
+        render_offer(template, _worker_config, context, output_path)
+
+_SAVE_WORKERS = 4
+
+def _filename_formatter(config: Config) -> Callable[..., str]:
+    """filename_pattern.format with the fields fixed for a run (date, format) already bound"""
+    return partial(config.settings.filename_pattern.format,
+                   date=config.offer.date, format=config.settings.format)
+
+def _bundle_context(config: Config, bundle_name: str, language: str, currency: str) -> Dict[str, Any]:
+    """Render context of a bundle offer"""
     bundle = config.bundles[bundle_name]
     
     # Convert product references to just names
     product_names = [p.name if hasattr(p, 'name') else p for p in bundle.products]
     
-    for lang in config.languages:
+    # Build bundle context with proper types
+    context = build_context(config, language, bundle_name, currency)
+    context.update({
+        "bundle": {
+            "name": bundle.name,
+            "discount": int(bundle.discount["percentage"])  # Convert to integer
+        },
+        "products": product_names,
+        "discount": f"{int(bundle.discount['percentage'])}%"  # Format as percentage string
+    })
+    return context
+
+def _render_bundle_job(template_path: Path, language: str, bundle_name: str, renders: List[Tuple[str, Path]]):
+    """Render the documents of one (bundle, language); runs in a worker process"""
+    for currency, output_path in renders:
+        context = _bundle_context(_worker_config, bundle_name, language, currency)
+        template = load_template(template_path)
+        render_offer(template, _worker_config, context, output_path)
+
+def generate_bundle_offer(config: Config, bundle_name: str, executor: Optional[Executor] = None):
+    """
+    Generate offer documents for a product bundle.
+    With a process executor started by _init_worker, each language renders in a worker.
+    """
+    bundle = config.bundles[bundle_name]
+    
+    # Get bundle template or fallback to standard
+    template_pattern = bundle.template or config.settings.template_pattern
+    templates = find_templates(config, template_pattern, config.languages)
+
+    # Create output directory
+    output_dir = config.output_path / "bundles" / bundle_name
+    _ensure_dir(output_dir)
+
+    jobs = []
+    format_filename = _filename_formatter(config)
+    for lang, template_path in templates.items():
+        renders = []
         for currency in config.currencies:
-            # Build bundle context with proper types
-            context = build_context(config, lang, bundle_name, currency)
-            context.update({
-                "bundle": {
-                    "name": bundle.name,
-                    "discount": int(bundle.discount["percentage"])  # Convert to integer
-                },
-                "products": product_names,
-                "discount": f"{int(bundle.discount['percentage'])}%"  # Format as percentage string
-            })
-            
-            # Get bundle template or fallback to standard
-            template_name = bundle.template or config.settings.template_pattern
-            template_path = config.templates_path / template_name.format(language=lang)
-            
-            if not template_path.exists():
-                logger.error(f"Missing bundle template for {lang}: {template_path}")
-                continue
-                
-            # Create output directory
-            output_dir = config.output_path / "bundles" / bundle_name
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
             # Generate output filename
-            output_filename = config.settings.filename_pattern.format(
-                product=bundle.name,
-                language=lang,
-                currency=currency,
-                date=config.offer.date,
-                format=config.settings.format
-            )
-            output_file = output_dir / output_filename
-            
-            # Render the bundle offer
-            template = DocxTemplate(str(template_path))
-            render_offer(template, config, context, output_file)
+            output_filename = format_filename(product=bundle.name, language=lang, currency=currency)
+            renders.append((currency, output_dir / output_filename))
+        jobs.append((template_path, lang, bundle_name, renders))
+
+    if executor is not None:
+        for future in [executor.submit(_render_bundle_job, *job) for job in jobs]:
+            future.result()  # Surface worker errors
+        return
+
+    # Write each document in the background while the next one renders
+    saves = []
+    with ThreadPoolExecutor(max_workers=_SAVE_WORKERS) as save_pool:
+        for template_path, lang, _, renders in jobs:
+            for currency, output_file in renders:
+                context = _bundle_context(config, bundle_name, lang, currency)
+                template = load_template(template_path)
+                saves.append(render_offer(template, config, context, output_file, save_pool))
+
+        for future in saves:
+            future.result()  # Surface save errors
 
 def main():
     """Main entry point for the offer document generator."""
@@ -339,45 +759,42 @@ def main():
     languages = config.languages
     currencies = config.currencies
     
-    # Generate offer documents for each combination
-    for lang in languages:
-        for currency in currencies:
-            for product in products:
-                # Build context with currency
-                context = build_context(config, lang, product, currency)
-                
-                # Get template path using configured pattern
-                template_filename = config.settings.template_pattern.format(language=lang)
-                template_path = config.templates_path / template_filename
-                if not template_path.exists():
-                    logger.error(f"Missing template for {lang}: {template_path}")
-                    continue
+    # Generate offer documents for each combination. Currency only changes
+    # the CURRENCY context value, so it is the innermost loop and the
+    # per-language/per-product work above it runs once per job.
+    jobs = []
+    templates = find_templates(config, config.settings.template_pattern, languages)
+    format_filename = _filename_formatter(config)
+    for lang, template_path in templates.items():
+        for product in products:
+            # Create output directory
+            output_dir = config.output_path / product
+            _ensure_dir(output_dir)
 
-                # Create output directory
-                output_dir = config.output_path / product
-                output_dir.mkdir(parents=True, exist_ok=True)
-                
+            renders = []
+            for currency in currencies:
                 # Generate output filename using configured pattern
-                fmt = config.settings.format
-                output_filename = config.settings.filename_pattern.format(
-                    product=product,
-                    language=lang,
-                    currency=currency,
-                    date=config.offer.date,
-                    format=fmt
-                )
+                output_filename = format_filename(product=product, language=lang, currency=currency)
                 output_file = output_dir / output_filename
-                
-                # Render the offer document
-                template = DocxTemplate(str(template_path))
-                render_offer(template, config, context, output_file)
-    
-    # Generate bundle offers if requested
-    if "--bundles" in sys.argv:
-        print(colorize("\n📦 Generating bundle offers:", 'CYAN'))
-        for bundle_name in config.bundles:
-            print(colorize(f"\n🔖 Bundle: {bundle_name}", 'GREEN'))
-            generate_bundle_offer(config, bundle_name)
+                renders.append((currency, output_file))
+            jobs.append((template_path, lang, product, renders))
+
+    # Every job writes its own files, so jobs are spread across processes
+    bundles = config.bundles if "--bundles" in sys.argv else {}
+    if jobs or bundles:
+        workers = min(max(len(jobs), len(languages)), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(config,)) as executor:
+            if jobs:
+                for _ in executor.map(_render_job, *zip(*jobs)):
+                    pass  # Consume results to surface worker exceptions
+
+            # Generate bundle offers if requested, reusing the warm workers
+            if bundles:
+                print(colorize("\n📦 Generating bundle offers:", 'CYAN'))
+                for bundle_name in bundles:
+                    print(colorize(f"\n🔖 Bundle: {bundle_name}", 'GREEN'))
+                    generate_bundle_offer(config, bundle_name, executor)
 
 if __name__ == "__main__":
     main()
@@ -2,92 +2,171 @@ import sys
 import os
 import unittest
 import shutil
+import tempfile
+import contextlib
+import io
 import random
+import re
 import zipfile
 import zipfile
 from pathlib import Path
 from pathlib import Path
 import yaml
+# LibYAML C bindings when PyYAML was built against them
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 import docx
+from docx.enum.text import WD_BREAK, WD_UNDERLINE
+from docx.oxml import parse_xml
 from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
 from docxtpl import DocxTemplate, RichText
 import offerdocgenerator
+from offerdoc.utils import file_index
+from offerdoc.utils.docx_reader import paragraph_runs, paragraph_texts, paragraph_xml
+from xml.sax.saxutils import escape as xml_escape
 
 class TestOfferDocGenerator(unittest.TestCase):
     CLEANUP = False  # Set to False to keep generated files
     
-    def test_directory_creation(self):
-        """Verify test directory structure is created"""
-        self.assertTrue(self.templates_dir.exists())
-        self.assertTrue(self.textblocks_dir.exists())
-        self.assertTrue((self.textblocks_dir / "common").exists())
-        self.assertTrue((self.textblocks_dir / "products" / self.product_name).exists())
-
     CLEANUP = False  # Set to False to keep generated files
     TEST_DIR_NAME = "test_data"  # Fixed directory name
     
     def _validate_docx(self, path: Path) -> bool:
         """Validate DOCX file structure"""
         try:
+            # A readable archive whose document part has at least one paragraph
             with zipfile.ZipFile(path) as z:
                 if 'word/document.xml' not in z.namelist():
                     return False
-                doc = docx.Document(path)
-                return len(doc.paragraphs) > 0
+                xml = z.read('word/document.xml')
+            return b'<w:p>' in xml or b'<w:p ' in xml
         except (zipfile.BadZipFile, Exception):
             return False
             
-    def setUp(self):
-        """Set up test fixtures in shared directory"""
+    # Fixtures that tests rewrite in place; restored from memory, the rest copied
+    EDITED_FIXTURES = {"test_config.yaml", "templates/base_EN.docx", "templates/base_DE.docx"}
+
+    # Zip parts of a blank document, shared by the textblock fixtures
+    _textblock_blueprint = None
+
+    # Template expressions bundle templates must not contain
+    FORBIDDEN_TEMPLATE_PATTERNS = tuple(re.compile(pattern) for pattern in (
+        r'\{\{.*\.(save|delete|write).*\}\}',
+        r'\{\{.*__.*\}\}',
+        r'\{\{.*config\.security.*\}\}'
+    ))
+
+    @classmethod
+    def _base_config(cls) -> dict:
+        """Fresh copy of the fixture config; tests override whole sections from it"""
+        return {
+            "offer": {
+                "number": "2025-001",
+                "date": "2025-02-02",
+                "validity": {
+                    "EN": "30 days",
+                    "DE": "30 Tage"
+                }
+            },
+            "settings": {
+                "products": str(cls.textblocks_dir / "products"),
+                "common": str(cls.textblocks_dir / "common"),
+                "output": str(cls.output_dir),
+                "templates": str(cls.templates_dir),
+                "format": "docx",
+                "prefix": "TestOffer_"
+            },
+            "customer": {
+                "name": "Example Corp",
+                "address": "123 Example Street",
+                "city": "Example City",
+                "zip": "12345",
+                "country": "Example Country"
+            },
+            "sales": {
+                "name": "John Doe",
+                "email": "john.doe@example.com",
+                "phone": "+1 234 567 890"
+            },
+            "bundles": {
+                "web_security_pack": {
+                    "name": "Web Security Package",
+                    "products": ["Web Application Security Assessment", "API Security Review"],
+                    "discount": {"percentage": 15.0},
+                    "template": "bundle_base_{language}.docx",
+                    "variables": {}
+                }
+            }
+        }
+
+    @classmethod
+    def _config_with(cls, **sections) -> dict:
+        """Base config with the given sections merged key-by-key over the defaults"""
+        config = cls._base_config()
+        for name, values in sections.items():
+            if isinstance(values, dict) and isinstance(config.get(name), dict):
+                config[name] = {**config[name], **values}
+            else:
+                config[name] = values
+        return config
+
+    @classmethod
+    def setUpClass(cls):
+        """Build the fixture files once; setUp links them into the shared directory"""
         # Base test directory
-        self.script_dir = Path(__file__).parent
-        self.test_root = self.script_dir / "test_output" 
-        self.test_run_dir = self.test_root / self.TEST_DIR_NAME
+        cls.script_dir = Path(__file__).parent
+        # OFFERDOC_TEST_ROOT moves the test files elsewhere, e.g. to /dev/shm
+        cls.test_root = Path(os.environ.get("OFFERDOC_TEST_ROOT") or cls.script_dir / "test_output")
+        # Each pytest-xdist worker gets its own run directory
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        cls.test_run_dir = cls.test_root / (f"{cls.TEST_DIR_NAME}_{worker}" if worker else cls.TEST_DIR_NAME)
         
         # Add test for Jinja2 loops and RichText
-        self.loop_template = self.test_run_dir / "templates" / "loop_test.docx"
-        
-        # Clean existing test data if cleanup enabled
-        if self.CLEANUP and self.test_run_dir.exists():
-            shutil.rmtree(self.test_run_dir)
-            
-        # Create fresh directory structure
-        self.test_run_dir.mkdir(parents=True, exist_ok=True)
+        cls.loop_template = cls.test_run_dir / "templates" / "loop_test.docx"
         
-        # Now create subdirectories
-        self.config_file = self.test_run_dir / "test_config.yaml"
-        self.templates_dir = self.test_run_dir / "templates"
-        self.output_dir = self.test_run_dir / "output"
-        self.textblocks_dir = self.test_run_dir / "textblocks"
-        self.product_name = "Web Application Security Assessment"
+        # Paths used by the tests
+        cls.config_file = cls.test_run_dir / "test_config.yaml"
+        cls.templates_dir = cls.test_run_dir / "templates"
+        cls.output_dir = cls.test_run_dir / "output"
+        cls.textblocks_dir = cls.test_run_dir / "textblocks"
+        cls.product_name = "Web Application Security Assessment"
+        cls.product_name2 = "API Security Review"
+        cls.template_file_en = cls.templates_dir / "base_EN.docx"
+        cls.template_file_de = cls.templates_dir / "base_DE.docx"
+
+        # Fixtures are built in their own directory with the same layout
+        cls.test_root.mkdir(parents=True, exist_ok=True)
+        cls._fixture_root = Path(tempfile.mkdtemp(prefix=".fixtures_", dir=cls.test_root))
+        templates_dir = cls._fixture_root / "templates"
+        textblocks_dir = cls._fixture_root / "textblocks"
 
         # Create required subdirectories
-        self.templates_dir.mkdir(exist_ok=True)
-        self.output_dir.mkdir(exist_ok=True)
-        (self.textblocks_dir / "common").mkdir(parents=True, exist_ok=True)
-        (self.textblocks_dir / "products" / self.product_name).mkdir(parents=True, exist_ok=True)
+        templates_dir.mkdir()
+        (textblocks_dir / "common").mkdir(parents=True)
+        (textblocks_dir / "products" / cls.product_name).mkdir(parents=True)
 
         # Create common textblocks
-        self._create_textblock_file(
-            self.textblocks_dir / "common" / "section_1_1_EN.docx",
+        cls._create_textblock_file(
+            textblocks_dir / "common" / "section_1_1_EN.docx",
             "Our standard security assessment provides a comprehensive evaluation of your web application's security posture."
         )
-        self._create_textblock_file(
-            self.textblocks_dir / "common" / "section_1_1_DE.docx",
+        cls._create_textblock_file(
+            textblocks_dir / "common" / "section_1_1_DE.docx",
             "Unsere Standard-Sicherheitsbewertung bietet eine umfassende Evaluation der Sicherheitslage Ihrer Webanwendung."
         )
 
         # Create product-specific textblocks for first product
-        self._create_textblock_file(
-            self.textblocks_dir / "products" / self.product_name / "section_1_1_1_EN.docx",
+        cls._create_textblock_file(
+            textblocks_dir / "products" / cls.product_name / "section_1_1_1_EN.docx",
             """The Web Application Security Assessment includes:
 
 - Vulnerability scanning
 - Manual penetration testing
 - Code review"""
         )
-        self._create_textblock_file(
-            self.textblocks_dir / "products" / self.product_name / "section_1_1_1_DE.docx",
+        cls._create_textblock_file(
+            textblocks_dir / "products" / cls.product_name / "section_1_1_1_DE.docx",
             """Die Web Application Security Assessment beinhaltet:
 
 - Schwachstellenscanning
@@ -96,18 +175,17 @@ class TestOfferDocGenerator(unittest.TestCase):
         )
 
         # Create API Security Review product and textblocks
-        self.product_name2 = "API Security Review"
-        (self.textblocks_dir / "products" / self.product_name2).mkdir(parents=True, exist_ok=True)
-        self._create_textblock_file(
-            self.textblocks_dir / "products" / self.product_name2 / "section_1_1_1_EN.docx",
+        (textblocks_dir / "products" / cls.product_name2).mkdir(parents=True)
+        cls._create_textblock_file(
+            textblocks_dir / "products" / cls.product_name2 / "section_1_1_1_EN.docx",
             """The API Security Review includes:
 
 - API endpoint security testing
 - Authentication mechanism review
 - Data validation assessment"""
         )
-        self._create_textblock_file(
-            self.textblocks_dir / "products" / self.product_name2 / "section_1_1_1_DE.docx",
+        cls._create_textblock_file(
+            textblocks_dir / "products" / cls.product_name2 / "section_1_1_1_DE.docx",
             """Die API-Sicherheitsüberprüfung umfasst:
 
 - API-Endpunkt-Sicherheitstests
@@ -116,11 +194,10 @@ class TestOfferDocGenerator(unittest.TestCase):
         )
 
         # Create proper bundle templates with required variables
-        self._create_bundle_templates()
+        cls._create_bundle_templates(templates_dir)
 
         # Create base templates for EN and DE
         # English template
-        self.template_file_en = self.templates_dir / "base_EN.docx"
         doc = docx.Document()
         doc.add_heading('Offer: {{ offer.number }}', 0)
         doc.add_paragraph('Date: {{ offer.date }}')
@@ -141,10 +218,9 @@ class TestOfferDocGenerator(unittest.TestCase):
         doc.add_paragraph('{{ sales.name }}')
         doc.add_paragraph('{{ sales.email }}')
         doc.add_paragraph('{{ sales.phone }}')
-        doc.save(str(self.template_file_en))
+        doc.save(str(templates_dir / "base_EN.docx"))
 
         # German template
-        self.template_file_de = self.templates_dir / "base_DE.docx"
         doc = docx.Document()
         doc.add_heading('Angebot: {{ offer.number }}', 0)
         doc.add_paragraph('Datum: {{ offer.date }}')
@@ -165,65 +241,83 @@ class TestOfferDocGenerator(unittest.TestCase):
         doc.add_paragraph('{{ sales.name }}')
         doc.add_paragraph('{{ sales.email }}')
         doc.add_paragraph('{{ sales.phone }}')
-        doc.save(str(self.template_file_de))
+        doc.save(str(templates_dir / "base_DE.docx"))
 
         # Create config file
-        config = {
-            "offer": {
-                "number": "2025-001",
-                "date": "2025-02-02",
-                "validity": {
-                    "EN": "30 days",
-                    "DE": "30 Tage"
-                }
-            },
-            "settings": {
-                "products": str(self.textblocks_dir / "products"),
-                "common": str(self.textblocks_dir / "common"),
-                "output": str(self.output_dir),
-                "templates": str(self.templates_dir),
-                "format": "docx",
-                "prefix": "TestOffer_"
-            },
-            "customer": {
-                "name": "Example Corp",
-                "address": "123 Example Street",
-                "city": "Example City",
-                "zip": "12345",
-                "country": "Example Country"
-            },
-            "sales": {
-                "name": "John Doe",
-                "email": "john.doe@example.com",
-                "phone": "+1 234 567 890"
-            },
-            "bundles": {
-                "web_security_pack": {
-                    "name": "Web Security Package",
-                    "products": ["Web Application Security Assessment", "API Security Review"],
-                    "discount": {"percentage": 15.0},
-                    "template": "bundle_base_{language}.docx",
-                    "variables": {}
-                }
-            }
-        }
-        with open(self.config_file, 'w') as f:
-            yaml.dump(config, f)
+        config = cls._base_config()
+        (cls._fixture_root / "test_config.yaml").write_bytes(yaml.dump(config, Dumper=SafeDumper, encoding='utf-8'))
+
+        # Edited fixtures are kept in memory and written back with one write each
+        cls._fixture_bytes = {name: (cls._fixture_root / name).read_bytes() for name in cls.EDITED_FIXTURES}
+
+        # The fixture tree is walked once; setUp replays it, parents before children
+        entries = sorted(cls._fixture_root.rglob("*"))
+        cls._fixture_dirs = [path.relative_to(cls._fixture_root) for path in entries if path.is_dir()]
+        cls._fixture_files = [path for path in entries if not path.is_dir()]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls._fixture_root, ignore_errors=True)
+
+    def setUp(self):
+        """Set up test fixtures in shared directory"""
+        # Clean existing test data if cleanup enabled
+        if self.CLEANUP and self.test_run_dir.exists():
+            shutil.rmtree(self.test_run_dir)
+            
+        # Create fresh directory structure
+        self.test_run_dir.mkdir(parents=True, exist_ok=True)
+        for relative in self._fixture_dirs:
+            (self.test_run_dir / relative).mkdir(exist_ok=True)
+        self.output_dir.mkdir(exist_ok=True)
+        for source in self._fixture_files:
+            relative = source.relative_to(self._fixture_root)
+            target = self.test_run_dir / relative
+            target.unlink(missing_ok=True)
+            blueprint = self._fixture_bytes.get(relative.as_posix())
+            if blueprint is not None:
+                target.write_bytes(blueprint)
+            else:
+                # A copy, not a link: a test saving over a file must not change the fixture
+                shutil.copyfile(source, target)
+
+    @staticmethod
+    def _doc_paragraphs(path: Path) -> list:
+        """Paragraph texts of a DOCX read straight from word/document.xml"""
+        with zipfile.ZipFile(path) as z:
+            return paragraph_texts(z.read('word/document.xml'))
 
-    def _create_textblock_file(self, file_path: Path, content: str):
+    @classmethod
+    def _create_textblock_file(cls, file_path: Path, content: str):
         """Helper method to create a docx file with given content."""
-        doc = docx.Document()
+        if cls._textblock_blueprint is None:
+            # Parts of an empty python-docx document; only document.xml differs per file
+            blank = io.BytesIO()
+            docx.Document().save(blank)
+            with zipfile.ZipFile(blank) as z:
+                parts = [(info, z.read(info)) for info in z.infolist()]
+            cls._textblock_blueprint = parts
+        body = []
         # Add each paragraph with proper styling
         for paragraph in content.split('\n\n'):
             if paragraph.strip():
-                p = doc.add_paragraph()
+                text = paragraph.strip()
                 # If it's a bullet point, use a list style
-                if paragraph.strip().startswith('-'):
-                    p.style = 'List Bullet'
-                    p.text = paragraph.strip()[2:]  # Remove the '- ' prefix
-                else:
-                    p.text = paragraph.strip()
-        doc.save(str(file_path))
+                style = ''
+                if text.startswith('-'):
+                    style = '<w:pPr><w:pStyle w:val="ListBullet"/></w:pPr>'
+                    text = text[2:]  # Remove the '- ' prefix
+                # Written by hand, the way python-docx's p.text does, so the
+                # fixtures do not depend on the docx_reader code under test
+                runs = '<w:br/>'.join(
+                    f'<w:t xml:space="preserve">{xml_escape(line)}</w:t>' for line in text.split('\n')
+                )
+                body.append(f'<w:p>{style}<w:r>{runs}</w:r></w:p>')
+        with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as z:
+            for info, data in cls._textblock_blueprint:
+                if info.filename == 'word/document.xml':
+                    data = data.replace(b'<w:body>', b'<w:body>' + "".join(body).encode(), 1)
+                z.writestr(info, data)
 
     def tearDown(self):
         """Conditional cleanup of test output directory"""
@@ -247,12 +341,79 @@ class TestOfferDocGenerator(unittest.TestCase):
         self.assertEqual(config.settings.products, self.textblocks_dir / "products")
         self.assertEqual(config.settings.common, self.textblocks_dir / "common")
 
+    def test_context_follows_config_edits(self):
+        """Contexts reflect in-place config edits and do not share dicts"""
+        config = offerdocgenerator.load_config(self.config_file)
+        first = offerdocgenerator.build_context(config, "EN", self.product_name, "CHF")
+        first["offer"]["number"] = "from-context"
+        config.offer.number = "CHANGED"
+        second = offerdocgenerator.build_context(config, "EN", self.product_name, "CHF")
+        self.assertEqual(second["offer"]["number"], "CHANGED")
+        self.assertIsNot(first["offer"], second["offer"])
+        self.assertEqual(offerdocgenerator.resolve_config_variable("offer.number", config), "CHANGED")
+        config.offer.number = "CHANGED-AGAIN"
+        self.assertEqual(offerdocgenerator.resolve_config_variable("offer.number", config), "CHANGED-AGAIN")
+
+    def test_resolve_config_variable(self):
+        """Single lookups agree with the flat path table and reject unknown paths"""
+        config = offerdocgenerator.load_config(self.config_file)
+        for path, value in config.config_paths().items():
+            self.assertEqual(offerdocgenerator.resolve_config_variable(path, config), value, path)
+        for path in ("LANGUAGE", "section_1_1", "offer.missing", "offer.number.deeper"):
+            with self.assertRaises(ValueError, msg=path):
+                offerdocgenerator.resolve_config_variable(path, config)
+
+    def test_compress_level(self):
+        """settings.compress_level is applied to saved documents without patching python-docx"""
+        config = offerdocgenerator.load_config(self.config_file)
+        self.assertIsNone(config.settings.compress_level)
+        context = offerdocgenerator.build_context(config, "EN", self.product_name, "CHF")
+
+        sizes = {}
+        for level in (None, 0, 1, 9):
+            config.settings = config.settings.model_copy(update={"compress_level": level})
+            output_path = self.output_dir / f"compress_{level}.docx"
+            template = offerdocgenerator.load_template(self.template_file_en)
+            offerdocgenerator.render_offer(template, config, dict(context), output_path)
+            sizes[level] = output_path.stat().st_size
+            with zipfile.ZipFile(output_path) as z:
+                types = {info.compress_type for info in z.infolist()}
+                self.assertIsNone(z.testzip())
+            expected = zipfile.ZIP_STORED if level == 0 else zipfile.ZIP_DEFLATED
+            self.assertEqual(types, {expected}, f"compress_level={level}")
+            self.assertTrue(self._validate_docx(output_path))
+
+        self.assertGreater(sizes[0], sizes[1])
+        self.assertGreaterEqual(sizes[1], sizes[9])
+        # python-docx keeps its own ZipFile; the level is applied per save
+        self.assertIs(docx.opc.phys_pkg.ZipFile, zipfile.ZipFile)
+
+    def test_load_config_cache(self):
+        """Repeated loads return independent configs and pick up file changes"""
+        first = offerdocgenerator.load_config(self.config_file)
+        first.offer.number = "mutated"
+        second = offerdocgenerator.load_config(self.config_file)
+        self.assertEqual(second.offer.number, "2025-001")
+
+        with open(self.config_file) as f:
+            config_data = yaml.load(f, Loader=SafeLoader)
+        config_data["offer"]["number"] = "2025-002-REV"
+        self.config_file.write_bytes(yaml.dump(config_data, Dumper=SafeDumper, encoding='utf-8'))
+
+        third = offerdocgenerator.load_config(self.config_file)
+        self.assertEqual(third.offer.number, "2025-002-REV")
+
+        # Clearing the cache validates the file again
+        offerdocgenerator.load_config.cache_clear()
+        fourth = offerdocgenerator.load_config(self.config_file)
+        self.assertEqual(fourth.offer.number, "2025-002-REV")
+
     def test_load_textblocks(self):
         """Test dynamic loading of textblocks from product directory"""
         config = offerdocgenerator.load_config(self.config_file)
         
         # Create a template instance
-        template = DocxTemplate(str(self.template_file_en))
+        template = offerdocgenerator.load_template(self.template_file_en)
         
         # Test German textblocks
         section_1_1_de, _ = offerdocgenerator.load_textblock("section_1_1", config, self.product_name, "DE", template)
@@ -272,6 +433,137 @@ class TestOfferDocGenerator(unittest.TestCase):
         self.assertIn("comprehensive evaluation", str(section_1_1_en))
         self.assertIn("Vulnerability scanning", str(section_1_1_1_en))
 
+    def test_rewrite_within_mtime_tick(self):
+        """Files rewritten without an mtime change are still re-read when their size differs"""
+        config = offerdocgenerator.load_config(self.config_file)
+        template = offerdocgenerator.load_template(self.template_file_en)
+        textblock_path = self.textblocks_dir / "common" / "tick_check_EN.docx"
+        self._create_textblock_file(textblock_path, "First version")
+        self.addCleanup(textblock_path.unlink)
+        stamp = textblock_path.stat().st_mtime_ns
+        self.assertIn("First version", str(offerdocgenerator.load_textblock(
+            "tick_check", config, self.product_name, "EN", template)[0]))
+
+        # Same mtime, as on a filesystem with coarse timestamps
+        self._create_textblock_file(textblock_path, "Second, longer version of the block")
+        os.utime(textblock_path, ns=(stamp, stamp))
+        self.assertIn("Second, longer version", str(offerdocgenerator.load_textblock(
+            "tick_check", config, self.product_name, "EN", template)[0]))
+
+    @staticmethod
+    @contextlib.contextmanager
+    def _case_insensitive_fs():
+        """List directories as if their filesystem resolved names regardless of case"""
+        file_index._scan_dir.cache_clear()
+        try:
+            with mock.patch.object(file_index, "_ignores_case", return_value=True):
+                yield
+        finally:
+            file_index._scan_dir.cache_clear()
+
+    def test_textblock_lookup_stats_each_directory_once(self):
+        """Textblock candidates are checked in the directory listing, not stat'ed one by one"""
+        config = offerdocgenerator.load_config(self.config_file)
+        template = offerdocgenerator.load_template(self.template_file_en)
+        # Also a pattern that bypasses the listing index
+        config.textblock_patterns = ["{var_name}_{language}.docx", "{var_name}-{var_name}.docx"]
+        real_stat = Path.stat
+        with mock.patch.object(Path, "stat", autospec=True, side_effect=real_stat) as stat:
+            self.assertEqual(offerdocgenerator.load_textblock("no_such_block", config, self.product_name,
+                                                              "EN", template), (None, None))
+        self.assertEqual(stat.call_count, 2)  # The product and common directories
+
+    def test_load_textblocks_case_insensitive_fs(self):
+        """Textblock names differing only in case are found where the filesystem ignores case"""
+        config = offerdocgenerator.load_config(self.config_file)
+        template = offerdocgenerator.load_template(self.template_file_en)
+        common = self.textblocks_dir / "common"
+        shutil.copyfile(common / "section_1_1_EN.docx", common / "Casing_Check_EN.docx")
+        self.addCleanup((common / "Casing_Check_EN.docx").unlink)
+
+        with self._case_insensitive_fs():
+            textblock, path = offerdocgenerator.load_textblock("casing_check", config, self.product_name, "EN", template)
+        self.assertIn("comprehensive evaluation", str(textblock))
+        self.assertEqual(path, common / "Casing_Check_EN.docx")
+
+        # A case-sensitive filesystem still reports it missing
+        self.assertEqual(
+            offerdocgenerator.load_textblock("casing_check", config, self.product_name, "EN", template),
+            (None, None)
+        )
+
+    def test_find_templates_case_insensitive_fs(self):
+        """Template names differing only in case are found where the filesystem ignores case"""
+        config = offerdocgenerator.load_config(self.config_file)
+        with self._case_insensitive_fs():
+            templates = offerdocgenerator.find_templates(config, "BASE_{language}.docx", ["EN", "DE"])
+        self.assertEqual(templates, {
+            "EN": self.templates_dir / "base_EN.docx",
+            "DE": self.templates_dir / "base_DE.docx",
+        })
+        self.assertEqual(offerdocgenerator.find_templates(config, "BASE_{language}.docx", ["EN"]), {})
+
+    def test_file_handler_case_insensitive_fs(self):
+        """FileHandler.find_textblock matches names differing only in case where the filesystem ignores case"""
+        config = offerdocgenerator.load_config(self.config_file)
+        handler = offerdocgenerator.FileHandler(config)
+        common = self.textblocks_dir / "common"
+        with self._case_insensitive_fs():
+            self.assertEqual(handler.find_textblock("SECTION_1_1", self.product_name, "EN"),
+                             common / "section_1_1_EN.docx")
+        self.assertIsNone(handler.find_textblock("SECTION_1_1", self.product_name, "EN"))
+        self.assertEqual(handler.find_textblock("section_1_1", self.product_name, "EN"),
+                         common / "section_1_1_EN.docx")
+
+    def test_get_product_names_follows_symlinks(self):
+        """Symlinked product folders are listed like real ones"""
+        config = offerdocgenerator.load_config(self.config_file)
+        linked = self.textblocks_dir / "products" / "Linked Product"
+        linked.symlink_to(self.textblocks_dir / "products" / self.product_name, target_is_directory=True)
+        self.addCleanup(linked.unlink)
+        (self.textblocks_dir / "products" / "notes.txt").write_text("not a product")
+        self.addCleanup((self.textblocks_dir / "products" / "notes.txt").unlink)
+
+        products = offerdocgenerator.get_product_names(config)
+        self.assertIn("Linked Product", products)
+        self.assertIn(self.product_name, products)
+        self.assertNotIn("notes.txt", products)
+
+    def _run_main(self, *args):
+        """Run offerdocgenerator.main() in-process on a copy of the fixture config"""
+        run_dir = Path(tempfile.mkdtemp(prefix="offerdoc_run_"))
+        self.addCleanup(shutil.rmtree, run_dir, ignore_errors=True)
+        config_path = run_dir / "offer.yaml"
+        if "test" in str(config_path).lower():
+            self.skipTest("main() redirects config paths containing 'test'")
+        config_path.write_bytes(self.config_file.read_bytes())
+        with mock.patch.object(sys, "argv", ["offerdocgenerator.py", str(config_path), *args]):
+            offerdocgenerator.main()
+
+    def test_main_renders_with_worker_processes(self):
+        """main() renders every product offer and bundle offer through its process pool"""
+        # Start from an empty output tree so only this run's files are counted
+        shutil.rmtree(self.output_dir)
+        self._run_main("--bundles")
+
+        for product in (self.product_name, self.product_name2):
+            offers = sorted((self.output_dir / product).glob("Offer_*.docx"))
+            self.assertEqual(len(offers), 4, product)
+            for offer in offers:
+                self.assertTrue(self._validate_docx(offer), offer.name)
+        bundle_offers = sorted((self.output_dir / "bundles" / "web_security_pack").glob("*.docx"))
+        self.assertEqual(len(bundle_offers), 4)
+        self.assertIn("Bundle Package: Web Security Package", self._doc_paragraphs(bundle_offers[0]))
+
+    def test_main_surfaces_worker_errors(self):
+        """A render failing in a worker process is raised from main()"""
+        doc = docx.Document()
+        doc.add_paragraph('{{ offer.number ')
+        doc.save(str(self.template_file_de))
+        with self.assertRaises(Exception) as cm:
+            self._run_main()
+        self.assertIn("TemplateSyntaxError", type(cm.exception).__name__)
+
     def test_template_variable_detection(self):
         """Test that template variables are properly detected"""
         # Create a test template in the temporary directory
@@ -296,6 +588,29 @@ class TestOfferDocGenerator(unittest.TestCase):
         with self.assertRaises(SystemExit):
             offerdocgenerator.load_config(Path("/non/existent/config.yaml"))
 
+    def test_bytecode_cache_opt_in(self):
+        """The bytecode cache is off unless OFFERDOC_BYTECODE_CACHE names a directory"""
+        offerdocgenerator._bytecode_cache.cache_clear()
+        self.addCleanup(offerdocgenerator._bytecode_cache.cache_clear)
+        with mock.patch.dict(os.environ, {"OFFERDOC_BYTECODE_CACHE": ""}):
+            self.assertIsNone(offerdocgenerator._bytecode_cache())
+
+        offerdocgenerator._bytecode_cache.cache_clear()
+        cache_dir = Path(tempfile.mkdtemp(prefix="offerdoc_bytecode_")) / "cache"
+        self.addCleanup(shutil.rmtree, cache_dir.parent, ignore_errors=True)
+        source = "{{ value }} <w:t>{{ other }}</w:t>"
+        with mock.patch.dict(os.environ, {"OFFERDOC_BYTECODE_CACHE": str(cache_dir)}):
+            escaping = offerdocgenerator._CachingEnvironment(autoescape=True)
+            plain = offerdocgenerator._CachingEnvironment(autoescape=False)
+            self.assertEqual(escaping.from_string(source).render(value="<a>", other="&"), "&lt;a&gt; <w:t>&amp;</w:t>")
+            # Same source, other options: compiled separately instead of reusing escaped bytecode
+            self.assertEqual(plain.from_string(source).render(value="<a>", other="&"), "<a> <w:t>&</w:t>")
+            self.assertEqual(len(list(cache_dir.iterdir())), 2)
+            # A fresh environment loads the stored bytecode
+            reloaded = offerdocgenerator._CachingEnvironment(autoescape=True)
+            self.assertEqual(reloaded.from_string(source).render(value="<a>", other="&"), "&lt;a&gt; <w:t>&amp;</w:t>")
+            self.assertEqual(len(list(cache_dir.iterdir())), 2)
+
     def test_jinja_loops_and_richtext(self):
         """Test Jinja2 loops with config data and RichText formatting"""
         # Create PROPERLY STRUCTURED template with loop in single paragraph
@@ -316,33 +631,18 @@ class TestOfferDocGenerator(unittest.TestCase):
         
         doc.save(str(self.loop_template))
         
-        # Update config with ALL required fields
-        config_data = {
-            'customer': {
-                'name': 'Example Corp',
-                'address': '123 Example Street',
-                'city': 'Example City',
-                'zip': '12345',
-                'country': 'Example Country'
-            },
-            'offer': {
-                'number': '2023-TEST',
-                'date': '2023-01-01',
-                'validity': {
-                    'EN': '30 days',
-                    'DE': '30 Tage'
-                }
-            },
-            'settings': {
+        # Fixture config with the loop's contacts and its own settings
+        config_data = self._config_with(
+            offer={'number': '2023-TEST', 'date': '2023-01-01'},
+            settings={
                 'products': 'products',
                 'common': 'common',
                 'output': 'output',
                 'templates': 'templates',
-                'format': 'docx',
                 'filename_pattern': 'Offer_{product}.docx',
                 'template_pattern': 'base_{language}.docx'
             },
-            'sales': {
+            sales={
                 'name': 'Test Sales',
                 'email': 'sales@example.com',
                 'phone': '+1234567890',
@@ -351,38 +651,31 @@ class TestOfferDocGenerator(unittest.TestCase):
                     {'name': 'Bob', 'email': 'bob@example.com'}
                 ]
             },
-            'languages': ["EN", "DE"],
-            'currencies': ["USD", "EUR"],
-            'textblock_patterns': [
-                "{var_name}_{language}.docx",
-                "{var_name}.docx"
-            ]
-        }
+            currencies=["USD", "EUR"]
+        )
     
-        with open(self.config_file, 'w') as f:
-            yaml.dump(config_data, f)
+        self.config_file.write_bytes(yaml.dump(config_data, Dumper=SafeDumper, encoding='utf-8'))
         
         # Load config properly using load_config
         config = offerdocgenerator.load_config(self.config_file)  # Get Config instance
     
         # Render document with the loaded config
-        template = DocxTemplate(str(self.loop_template))
+        template = offerdocgenerator.load_template(self.loop_template)
         context = offerdocgenerator.build_context(config, "EN", self.product_name, "CHF")
         output_path = self.output_dir / "loop_test.docx"
         offerdocgenerator.render_offer(template, config, context, output_path)
         
-        # Verify output
-        doc = docx.Document(str(output_path))
-        full_text = "\n".join(p.text for p in doc.paragraphs)
+        # Verify output; both checks share one read of document.xml
+        with zipfile.ZipFile(output_path) as z:
+            document_xml = z.read("word/document.xml")
+        full_text = "\n".join(paragraph_texts(document_xml))
         
         # Test loop results
         self.assertIn("Alice - alice@example.com", full_text)
         self.assertIn("Bob - bob@example.com", full_text)
         
         # Test RichText formatting
-        with zipfile.ZipFile(output_path) as z:
-            content = z.read("word/document.xml").decode()
-            self.assertIn("Example Corp", content)
+        self.assertIn("Example Corp", document_xml.decode())
 
 
     @unittest.skip("Temporarily disabled - needs investigation of DOTX template handling")
@@ -430,8 +723,7 @@ class TestOfferDocGenerator(unittest.TestCase):
             self.assertTrue(test_output.exists())
             
             # Verify the new document is valid
-            test_doc = docx.Document(str(test_output))
-            self.assertIn("Test added via template", test_doc.paragraphs[0].text)
+            self.assertIn("Test added via template", self._doc_paragraphs(test_output)[0])
         finally:
             if test_output.exists():
                 test_output.unlink()
@@ -450,13 +742,13 @@ class TestOfferDocGenerator(unittest.TestCase):
         context = offerdocgenerator.build_context(config, "EN", self.product_name, "CHF")
         output_path = self.output_dir / "special_chars_test.docx"
         
-        template = DocxTemplate(str(special_template))
+        template = offerdocgenerator.load_template(special_template)
         offerdocgenerator.render_offer(template, config, context, output_path)
         
         # Verify output
-        doc = docx.Document(str(output_path))
-        self.assertIn("Test & Company © 2024", doc.paragraphs[0].text)
-        self.assertIn("john.doe@example.com", doc.paragraphs[1].text)
+        paragraphs = self._doc_paragraphs(output_path)
+        self.assertIn("Test & Company © 2024", paragraphs[0])
+        self.assertIn("john.doe@example.com", paragraphs[1])
 
     def test_bundle_template_processing(self):
         """Test end-to-end bundle document generation with actual template"""
@@ -474,8 +766,7 @@ class TestOfferDocGenerator(unittest.TestCase):
         self.assertTrue(output_path.exists())
         
         # Verify template content
-        doc = docx.Document(str(output_path))
-        full_text = "\n".join(p.text for p in doc.paragraphs)
+        full_text = "\n".join(self._doc_paragraphs(output_path))
         
         # Check required bundle elements
         self.assertIn("Bundle Package: Web Security Package", full_text)
@@ -489,9 +780,11 @@ class TestOfferDocGenerator(unittest.TestCase):
         
         # Generate test documents
         for lang in ["EN", "DE"]:
+            template_path = self.template_file_en if lang == "EN" else self.template_file_de
             for currency in ["CHF", "EUR"]:
                 context = offerdocgenerator.build_context(config, lang, self.product_name, currency)
-                template = DocxTemplate(str(self.template_file_en if lang == "EN" else self.template_file_de))
+                # Template bytes are read once per language and shared across currencies
+                template = offerdocgenerator.load_template(template_path)
                 output_path = self.output_dir / f"test_doc_{lang}_{currency}.docx"
                 offerdocgenerator.render_offer(template, config, context, output_path)
                 
@@ -500,16 +793,15 @@ class TestOfferDocGenerator(unittest.TestCase):
                               f"Invalid DOCX file: {output_path.name}")
                 
                 # Check content
-                doc = docx.Document(output_path)
-                full_text = "\n".join(p.text for p in doc.paragraphs)
+                full_text = "\n".join(self._doc_paragraphs(output_path))
                 self.assertIn(currency, full_text)
                 self.assertIn(config.offer.number, full_text)
                 
     def test_bundle_template_variables(self):
         """Verify required variables exist in bundle template"""
         template_path = self.templates_dir / "bundle_base_EN.docx"
-        doc = DocxTemplate(str(template_path))
-        variables = doc.get_undeclared_template_variables()
+        doc = offerdocgenerator.load_template(template_path)
+        variables = offerdocgenerator.get_template_variables(doc)
         
         required_vars = {
             'bundle',
@@ -532,15 +824,8 @@ class TestOfferDocGenerator(unittest.TestCase):
         self.assertEqual(template_path.owner(), Path(__file__).owner(), "Owner mismatch")
         
         # Content validation
-        doc = docx.Document(str(template_path))
-        content = "\n".join(p.text for p in doc.paragraphs)
-        forbidden_patterns = [
-            r'\{\{.*\.(save|delete|write).*\}\}',
-            r'\{\{.*__.*\}\}',
-            r'\{\{.*config\.security.*\}\}'
-        ]
-        
-        for pattern in forbidden_patterns:
+        content = "\n".join(self._doc_paragraphs(template_path))
+        for pattern in self.FORBIDDEN_TEMPLATE_PATTERNS:
             self.assertNotRegex(content, pattern, "Forbidden pattern found")
 
     def test_richtext_format_preservation(self):
@@ -558,7 +843,7 @@ class TestOfferDocGenerator(unittest.TestCase):
         config = offerdocgenerator.load_config(self.config_file)
         
         # Create template instance
-        template = DocxTemplate(str(self.template_file_en))
+        template = offerdocgenerator.load_template(self.template_file_en)
         
         rt, _ = offerdocgenerator.load_textblock("section_formatted", config, self.product_name, "EN", template)
         self.assertIsNotNone(rt)  # Verify section exists
@@ -566,14 +851,16 @@ class TestOfferDocGenerator(unittest.TestCase):
         # Render document to check formatting
         output_path = self.output_dir / "richtext_test.docx"
         
-        # Create template with proper section variable
-        doc = docx.Document(str(self.template_file_en))
+        # Create template with proper section variable, edited in memory
+        doc = docx.Document(io.BytesIO(self.template_file_en.read_bytes()))
         p = doc.add_paragraph()
         p.add_run('{{r section_formatted }}')
-        doc.save(str(self.template_file_en))
+        edited = io.BytesIO()
+        doc.save(edited)
+        edited.seek(0)
         
         # Create template and render with proper context
-        template = DocxTemplate(str(self.template_file_en))
+        template = DocxTemplate(edited)
         context = offerdocgenerator.build_context(config, "EN", self.product_name, "CHF")
         context["section_formatted"] = rt
         template.render(context)
@@ -592,8 +879,7 @@ class TestOfferDocGenerator(unittest.TestCase):
             "offer": {"number": "123"},  # Missing settings, customer, sales
         }
         
-        with open(self.config_file, 'w') as f:
-            yaml.dump(invalid_config, f)
+        self.config_file.write_bytes(yaml.dump(invalid_config, Dumper=SafeDumper, encoding='utf-8'))
         
         with self.assertRaises(ValueError) as cm:
             offerdocgenerator.load_config(self.config_file)
@@ -605,6 +891,7 @@ class TestOfferDocGenerator(unittest.TestCase):
     def test_invalid_config_fields(self):
         """Test missing required fields within existing sections"""
         invalid_config = {
+            **self._base_config(),
             "offer": {
                 "number": "123",
                 # Missing date and validity
@@ -613,22 +900,9 @@ class TestOfferDocGenerator(unittest.TestCase):
                 "products": "./products",
                 # Missing common, output, and template_prefix
             },
-            "customer": {
-                "name": "Test Corp",
-                "address": "Test St",
-                "city": "Test City",
-                "zip": "12345",
-                "country": "Test Country"
-            },
-            "sales": {
-                "name": "Test Sales",
-                "email": "test@example.com",
-                "phone": "123456"
-            }
         }
         
-        with open(self.config_file, 'w') as f:
-            yaml.dump(invalid_config, f)
+        self.config_file.write_bytes(yaml.dump(invalid_config, Dumper=SafeDumper, encoding='utf-8'))
         
         with self.assertRaises(ValueError) as cm:
             offerdocgenerator.load_config(self.config_file)
@@ -673,8 +947,7 @@ class TestOfferDocGenerator(unittest.TestCase):
         }
         
         custom_config_path = self.test_run_dir / "custom_config.yaml"
-        with open(custom_config_path, 'w') as f:
-            yaml.dump(custom_config, f)
+        custom_config_path.write_bytes(yaml.dump(custom_config, Dumper=SafeDumper, encoding='utf-8'))
         
         config = offerdocgenerator.load_config(custom_config_path)
         
@@ -703,69 +976,83 @@ class TestOfferDocGenerator(unittest.TestCase):
 
     def test_render_offer(self):
         """Test rendering for all language/currency combinations in both DOCX and DOTX formats."""
+        # Add validity text to templates for nested config testing; the
+        # templates are shared by both formats, so edit them once
+        for template in [self.template_file_en, self.template_file_de]:
+            doc = docx.Document(str(template))
+            doc.add_paragraph('Validity: {{ offer.validity[LANGUAGE] }}')
+            doc.save(str(template))
+
         # Load fresh config for each format test
         for output_format in ["docx", "dotx"]:
             config = offerdocgenerator.load_config(self.config_file)
-            from copy import deepcopy
-            new_settings = deepcopy(config.settings)
-            new_settings.format = output_format
-            config.settings = new_settings
+            config.settings = config.settings.model_copy(update={"format": output_format})
             
             products = offerdocgenerator.get_product_names(config)
             prefix = "TestOffer_"  # Match the prefix set in setUp()
 
-            # Add validity text to templates for nested config testing
-            for template in [self.template_file_en, self.template_file_de]:
-                doc = docx.Document(str(template))
-                doc.add_paragraph('Validity: {{ offer.validity[LANGUAGE] }}')
-                doc.save(str(template))
+            # Render every combination; the saves (zip compression) overlap in a
+            # thread pool the way the generator itself hands them off
+            saves = []
+            with ThreadPoolExecutor(max_workers=offerdocgenerator._SAVE_WORKERS) as save_pool:
+                for product in products:
+                    for lang in ["EN", "DE"]:
+                        # Only the currency changes below, as in the generator's own render jobs
+                        base_context = offerdocgenerator.build_context(config, lang, product, "")
+                        for currency in ["CHF", "EUR"]:
+                            with self.subTest(product=product, language=lang, currency=currency, format=output_format):
+                                context = {**base_context, "CURRENCY": currency}
+                
+                                # Select and load template
+                                template_path = self.template_file_en if lang == "EN" else self.template_file_de
+                                template = offerdocgenerator.load_template(template_path)
+                
+                                # Get template variables (scanned once per template file) and resolve them
+                                template_vars = offerdocgenerator.get_template_variables(template)
+                                # Filter variables not already in context
+                                vars_to_resolve = template_vars - context.keys()
+                                resolved = offerdocgenerator.resolve_template_variables(vars_to_resolve, config, product, lang, template)
+                                context.update(resolved)
+                
+                                # Generate output path using config properties
+                                output_file = config.settings.output_path / product / f"{prefix}{product}_{lang}_{currency}.{output_format}"
+                                
+                                # Create product subdirectory
+                                output_file.parent.mkdir(parents=True, exist_ok=True)
+                                
+                                future = offerdocgenerator.render_offer(template, config, context, output_file, save_pool)
+                                saves.append(((product, lang, currency), output_file, future))
 
             # Verify files per product
-            for product in products:
-                for lang in ["EN", "DE"]:
-                    for currency in ["CHF", "EUR"]:
-                        with self.subTest(product=product, language=lang, currency=currency, format=output_format):
-                            # Build context with currency using build_context
-                            context = offerdocgenerator.build_context(config, lang, product, currency)
-            
-                            # Select and load template
-                            template_path = self.template_file_en if lang == "EN" else self.template_file_de
-                            template = DocxTemplate(str(template_path))
-            
-                            # Get template variables and resolve them
-                            template_vars = template.get_undeclared_template_variables()
-                            # Filter variables not already in context
-                            vars_to_resolve = {var for var in template_vars if var not in context}
-                            resolved = offerdocgenerator.resolve_template_variables(vars_to_resolve, config, product, lang, template)
-                            context.update(resolved)
-            
-                            # Generate output path using config properties
-                            output_file = config.settings.output_path / product / f"{prefix}{product}_{lang}_{currency}.{output_format}"
-                            
-                            # Create product subdirectory
-                            output_file.parent.mkdir(parents=True, exist_ok=True)
-                            
-                            # Render and verify
-                            offerdocgenerator.render_offer(template, config, context, output_file)
-                            self.assertTrue(output_file.exists())
-                            
-                            # Only validate DOCX content - skip for DOTX
-                            if output_format == "docx":
-                                doc = docx.Document(str(output_file))
-                                full_text = "\n".join(para.text for para in doc.paragraphs)
-                                self.assertIn(currency, full_text)
-                                self.assertIn(config.offer.number, full_text)
-                                self.assertIn(config.customer.name, full_text)
-                                self.assertIn(config.customer.address, full_text)
-                                self.assertIn(config.sales.email, full_text)
-                                self.assertIn(config.sales.phone, full_text)
+            for (product, lang, currency), output_file, future in saves:
+                with self.subTest(product=product, language=lang, currency=currency, format=output_format):
+                    future.result()  # Re-raises a failed save
+                    self.assertTrue(output_file.exists())
+                    
+                    # Only validate DOCX content - skip for DOTX
+                    if output_format == "docx":
+                        # One pass over the paragraphs, stopping once every value is found
+                        missing = {
+                            currency,
+                            config.offer.number,
+                            config.customer.name,
+                            config.customer.address,
+                            config.sales.email,
+                            config.sales.phone,
+                        }
+                        for paragraph in self._doc_paragraphs(output_file):
+                            missing = {needle for needle in missing if needle not in paragraph}
+                            if not missing:
+                                break
+                        self.assertFalse(missing, f"Missing from {output_file.name}: {missing}")
 
             # Verify file count for this format
-            generated_files = list(self.output_dir.glob(f"**/{prefix}*.{output_format}"))
-            self.assertEqual(len(generated_files), 8,
-                           f"Expected 8 files for {output_format}, found {len(generated_files)}")
+            generated_count = sum(1 for _ in self.output_dir.rglob(f"{prefix}*.{output_format}"))
+            self.assertEqual(generated_count, 8,
+                           f"Expected 8 files for {output_format}, found {generated_count}")
 
-    def _create_bundle_templates(self):
+    @staticmethod
+    def _create_bundle_templates(templates_dir: Path):
         """Generate test bundle templates programmatically"""
         for lang in ['EN', 'DE']:
             doc = docx.Document()
@@ -773,8 +1060,122 @@ class TestOfferDocGenerator(unittest.TestCase):
             doc.add_paragraph('Bundle Package: {{ bundle.name }}')
             doc.add_paragraph('Bundle Discount: {{ discount }}%')
             doc.add_paragraph('Products: {% for product in products %}{{ product }}{% endfor %}')
-            template_path = self.templates_dir / f"bundle_base_{lang}.docx"
+            template_path = templates_dir / f"bundle_base_{lang}.docx"
             doc.save(template_path)
 
+class TestDocxReader(unittest.TestCase):
+    """docx_reader against python-docx on the same documents"""
+
+    W = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+    @staticmethod
+    def _saved(doc) -> bytes:
+        """A python-docx document saved in memory"""
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
+
+    @classmethod
+    def _document_xml(cls, doc) -> bytes:
+        """word/document.xml of a python-docx document saved in memory"""
+        with zipfile.ZipFile(io.BytesIO(cls._saved(doc))) as z:
+            return z.read('word/document.xml')
+
+    def _append_xml(self, paragraph, xml: str):
+        """Append one raw element, written with the w: prefix, to a python-docx paragraph"""
+        tag_end = xml.index('>')
+        if xml[tag_end - 1] == '/':
+            tag_end -= 1
+        paragraph._p.append(parse_xml(f"{xml[:tag_end]} {self.W}{xml[tag_end:]}"))
+
+    def _assert_matches_python_docx(self, doc):
+        """paragraph_texts/paragraph_runs equal python-docx's view of the saved document"""
+        saved = self._saved(doc)
+        with zipfile.ZipFile(io.BytesIO(saved)) as z:
+            xml = z.read('word/document.xml')
+        reread = docx.Document(io.BytesIO(saved))
+        self.assertEqual(paragraph_texts(xml), [p.text for p in reread.paragraphs])
+        self.assertEqual(
+            paragraph_runs(xml),
+            tuple(tuple((r.text, r.bold, r.italic, r.underline) for r in p.runs) for p in reread.paragraphs)
+        )
+
+    def test_text_special_content(self):
+        """Tabs, breaks of every type, hyphens and carriage returns read like python-docx"""
+        doc = docx.Document()
+        run = doc.add_paragraph().add_run("a\tb\nc")
+        run.add_tab()
+        run.add_break()
+        run.add_break(WD_BREAK.PAGE)
+        run.add_break(WD_BREAK.COLUMN)
+        run.add_break(WD_BREAK.LINE_CLEAR_ALL)
+        run.add_text("end")
+        self._append_xml(doc.add_paragraph("x"), '<w:r><w:t>1</w:t><w:cr/><w:noBreakHyphen/><w:ptab w:relativeTo="margin" w:alignment="left" w:leader="none"/><w:t>2</w:t></w:r>')
+        doc.add_paragraph("")
+        self._assert_matches_python_docx(doc)
+
+    def test_hyperlinks_and_tables(self):
+        """Hyperlink text counts toward paragraph text but not runs; table paragraphs are skipped"""
+        doc = docx.Document()
+        paragraph = doc.add_paragraph("before ")
+        self._append_xml(paragraph, '<w:hyperlink w:anchor="x"><w:r><w:t>link</w:t></w:r></w:hyperlink>')
+        paragraph.add_run(" after")
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "cell text"
+        doc.add_paragraph("last")
+        self._assert_matches_python_docx(doc)
+        self.assertNotIn("cell text", paragraph_texts(self._document_xml(doc)))
+
+    def test_run_formatting(self):
+        """Tri-state bold/italic and every underline form match python-docx"""
+        doc = docx.Document()
+        paragraph = doc.add_paragraph()
+        paragraph.add_run("plain")
+        paragraph.add_run("bold").bold = True
+        paragraph.add_run("not bold").bold = False
+        paragraph.add_run("italic").italic = True
+        paragraph.add_run("not italic").italic = False
+        for underline in (True, False, WD_UNDERLINE.DOUBLE, WD_UNDERLINE.WAVY, WD_UNDERLINE.DOTTED):
+            paragraph.add_run(f"underline {underline}").underline = underline
+        self._append_xml(paragraph, '<w:r><w:rPr><w:b w:val="false"/><w:i w:val="off"/></w:rPr><w:t>off</w:t></w:r>')
+        self._append_xml(paragraph, '<w:r><w:rPr><w:b w:val="1"/><w:u/></w:rPr><w:t>bare u</w:t></w:r>')
+        self._assert_matches_python_docx(doc)
+
+    def _render_paragraph(self, runs) -> str:
+        """paragraph_xml output placed in a document body, read back by python-docx"""
+        doc = docx.Document()
+        body = doc.element.body
+        body.insert(0, parse_xml(paragraph_xml(runs).replace('<w:p>', f'<w:p {self.W}>', 1)))
+        return docx.Document(io.BytesIO(self._saved(doc))).paragraphs[0]
+
+    def test_paragraph_xml_escaping(self):
+        """Markup characters, tabs and line breaks survive paragraph_xml"""
+        text = 'a < b && c > "d" \'e\'\tf\ng'
+        paragraph = self._render_paragraph(((text, None, None, None),))
+        self.assertEqual(paragraph.text, text)
+
+    def test_paragraph_xml_formatting_and_merging(self):
+        """Neighbouring runs with the same formatting become one run; others keep theirs"""
+        runs = (
+            ("Bold ", True, None, None),
+            ("still bold", True, None, None),
+            (" italic", None, True, None),
+            (" double", None, None, WD_UNDERLINE.DOUBLE),
+            (" off", False, False, False),
+        )
+        xml = paragraph_xml(runs)
+        self.assertEqual(xml.count('<w:r>'), 4)
+        paragraph = self._render_paragraph(runs)
+        self.assertEqual(
+            [(r.text, r.bold, r.italic, r.underline) for r in paragraph.runs],
+            [("Bold still bold", True, None, None),
+             (" italic", None, True, None),
+             (" double", None, None, WD_UNDERLINE.DOUBLE),
+             (" off", False, False, False)]
+        )
+        # Runs read from a document and written back keep their formatting
+        self.assertEqual(paragraph_runs(self._document_xml(paragraph.part.document))[0],
+                         tuple((r.text, r.bold, r.italic, r.underline) for r in paragraph.runs))
+
 if __name__ == '__main__':
     unittest.main()